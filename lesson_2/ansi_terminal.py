@@ -0,0 +1,272 @@
+"""Terminal output by raw ANSI escape sequences, without curses.
+
+Drawing of the frame goes to one preallocated bytearray: cursor moves,
+attribute changes and the text. refresh() sends it to the terminal with
+a single os.write. The terminal keeps the model of the screen, so the border
+is sent only where something was drawn over it.
+Keys are read from stdin in cbreak mode and decoded to the curses key codes.
+"""
+import collections
+import curses
+import os
+import select
+import sys
+import termios
+import tty
+
+from curses_tools import LEFT_KEY_CODE, RIGHT_KEY_CODE, UP_KEY_CODE, DOWN_KEY_CODE
+
+
+# bytes preallocated for the frame, the buffer grows if a frame is larger
+FRAME_SIZE = 64 * 1024
+
+# curses attribute -> SGR parameter
+ATTRIBUTES = (
+    (curses.A_BOLD, 1),
+    (curses.A_DIM, 2),
+    (curses.A_UNDERLINE, 4),
+    (curses.A_BLINK, 5),
+    (curses.A_REVERSE, 7),
+)
+
+# arrows send CSI or SS3 sequences, depending on the cursor keys mode of the terminal
+KEYS = {
+    b'\x1b[A': UP_KEY_CODE, b'\x1bOA': UP_KEY_CODE,
+    b'\x1b[B': DOWN_KEY_CODE, b'\x1bOB': DOWN_KEY_CODE,
+    b'\x1b[C': RIGHT_KEY_CODE, b'\x1bOC': RIGHT_KEY_CODE,
+    b'\x1b[D': LEFT_KEY_CODE, b'\x1bOD': LEFT_KEY_CODE,
+}
+KEY_LENGTH = 3
+
+# alternate screen, hidden cursor, no line wrap at the right edge; and back
+ENTER = b'\x1b[?1049h\x1b[?25l\x1b[?7l\x1b[0m\x1b[2J'
+LEAVE = b'\x1b[0m\x1b[?7h\x1b[?25h\x1b[?1049l'
+
+# corners: top left, top right, bottom left, bottom right; then horizontal and vertical lines
+BORDER = '┌┐└┘─│'
+
+
+def _sgr(attr):
+    parameters = [0] + [parameter for flag, parameter in ATTRIBUTES if attr & flag]
+    return b'\x1b[' + b';'.join(b'%d' % parameter for parameter in parameters) + b'm'
+
+
+class AnsiTerminal:
+    """Terminal with the part of curses window API the game uses.
+
+    Text goes to the frame buffer at once, as escape sequences: the cursor
+    is moved only if the text does not continue the previous one, attributes
+    are set only when they change. refresh() writes the frame, the buffer
+    is used again for the next one.
+    """
+
+    def __init__(self, rows, columns, output_fd=1, input_fd=0, frame_size=FRAME_SIZE):
+        self.output_fd = output_fd
+        self.input_fd = input_fd
+        self.rows, self.columns = rows, columns
+
+        self._frame = bytearray(frame_size)
+        self._length = 0
+        self._sgr = {}
+        self._pending = bytearray()
+        self._codes = collections.deque()
+        self._reset_screen()
+
+        # statistics: writes to the terminal and bytes written
+        self.writes = 0
+        self.written = 0
+
+    def _reset_screen(self):
+        # what the terminal shows, size of the model is the size the screen was cleared at
+        self._symbols = [[' '] * self.columns for _ in range(self.rows)]
+        self._attrs = [[0] * self.columns for _ in range(self.rows)]
+        # unknown cursor position and attribute, the first text sets them
+        self._cursor = None
+        self._attr = None
+
+    def getmaxyx(self):
+        return self.rows, self.columns
+
+    def resize(self, rows, columns):
+        """Take the new size of the terminal, the screen model follows it on clear()."""
+
+        self.rows, self.columns = rows, columns
+
+    def clear(self):
+        self._reset_screen()
+        self._append(b'\x1b[0m\x1b[2J')
+
+    def addstr(self, row, column, text, attr=0):
+        """Add text to the frame. Text out of the screen is clipped."""
+
+        symbols = self._symbols
+        if not (0 <= row < len(symbols) and 0 <= column < len(symbols[row])):
+            return
+
+        text = str(text)[:len(symbols[row]) - column]
+        end = column + len(text)
+        symbols[row][column:end] = text
+        self._attrs[row][column:end] = [attr] * len(text)
+
+        if self._cursor != (row, column):
+            self._append(b'\x1b[%d;%dH' % (row + 1, column + 1))
+        if self._attr != attr:
+            sgr = self._sgr.get(attr)
+            if sgr is None:
+                sgr = self._sgr[attr] = _sgr(attr)
+            self._append(sgr)
+            self._attr = attr
+        self._append(text.encode())
+        self._cursor = (row, end)
+
+    addch = addstr
+
+    def border(self):
+        self._box(0, 0, len(self._symbols), len(self._symbols[0]) if self._symbols else 0)
+
+    def _box(self, top, left, rows, columns):
+        """Draw the border of the area, only the cells that do not show it yet."""
+
+        if rows < 2 or columns < 2:
+            return
+
+        top_left, top_right, bottom_left, bottom_right, horizontal, vertical = BORDER
+        bottom, right = top + rows - 1, left + columns - 1
+        self._draw_changed(top, left, top_left + horizontal * (columns - 2) + top_right)
+        self._draw_changed(bottom, left, bottom_left + horizontal * (columns - 2) + bottom_right)
+        for row in range(top + 1, bottom):
+            self._draw_changed(row, left, vertical)
+            self._draw_changed(row, right, vertical)
+
+    def _draw_changed(self, row, column, text):
+        if not 0 <= row < len(self._symbols):
+            return
+
+        symbols, attrs = self._symbols[row], self._attrs[row]
+        end = min(column + len(text), len(symbols))
+        position = column
+        while position < end:
+            if symbols[position] == text[position - column] and not attrs[position]:
+                position += 1
+                continue
+            run_start = position
+            while position < end and (symbols[position] != text[position - column] or attrs[position]):
+                position += 1
+            self.addstr(row, run_start, text[run_start - column:position - column])
+
+    def derwin(self, rows, columns, begin_row, begin_column):
+        return _Window(self, rows, columns, begin_row, begin_column)
+
+    def beep(self):
+        self._append(b'\a')
+
+    def refresh(self):
+        """Write the frame to the terminal by one write call."""
+
+        if not self._length:
+            return
+
+        with memoryview(self._frame) as frame:
+            position = 0
+            while position < self._length:
+                position += os.write(self.output_fd, frame[position:self._length])
+        self.writes += 1
+        self.written += self._length
+        self._length = 0
+
+    def _append(self, data):
+        end = self._length + len(data)
+        if end > len(self._frame):
+            self._frame.extend(bytes(max(end, 2 * len(self._frame)) - len(self._frame)))
+        self._frame[self._length:end] = data
+        self._length = end
+
+    def getch(self):
+        """Return code of the next key pressed, or -1 if there is none."""
+
+        if not self._codes:
+            self._read_keys()
+        return self._codes.popleft() if self._codes else -1
+
+    def _read_keys(self):
+        if not select.select([self.input_fd], [], [], 0)[0]:
+            return
+        pending = self._pending
+        pending += os.read(self.input_fd, 1024)
+
+        position = 0
+        while position < len(pending):
+            if pending[position] == 0x1b:
+                sequence = bytes(pending[position:position + KEY_LENGTH])
+                code = KEYS.get(sequence)
+                if code is not None:
+                    self._codes.append(code)
+                    position += KEY_LENGTH
+                    continue
+                if len(sequence) < KEY_LENGTH and any(key.startswith(sequence) for key in KEYS):
+                    # rest of the sequence comes with the next read
+                    break
+            self._codes.append(pending[position])
+            position += 1
+        del pending[:position]
+
+    def nodelay(self, flag):
+        # getch never waits
+        pass
+
+    def keypad(self, flag):
+        # arrow keys are always decoded
+        pass
+
+
+class _Window:
+    """Part of the terminal with shifted coordinates, like curses derwin."""
+
+    def __init__(self, terminal, rows, columns, begin_row, begin_column):
+        self.terminal = terminal
+        self.rows, self.columns = rows, columns
+        self.begin_row, self.begin_column = begin_row, begin_column
+
+    def __getattr__(self, name):
+        return getattr(self.terminal, name)
+
+    def getmaxyx(self):
+        return self.rows, self.columns
+
+    def resize(self, rows, columns):
+        self.rows, self.columns = rows, columns
+
+    def addstr(self, row, column, text, attr=0):
+        if not (0 <= row < self.rows and 0 <= column < self.columns):
+            return
+        text = str(text)[:self.columns - column]
+        self.terminal.addstr(self.begin_row + row, self.begin_column + column, text, attr)
+
+    addch = addstr
+
+    def border(self):
+        self.terminal._box(self.begin_row, self.begin_column, self.rows, self.columns)
+
+    def clear(self):
+        blank = ' ' * self.columns
+        for row in range(self.rows):
+            self.terminal._draw_changed(self.begin_row + row, self.begin_column, blank)
+
+
+def wrapper(func, *args, **kwargs):
+    """Call func(terminal, ...) with the terminal set up for the game, like curses.wrapper.
+
+    Terminal is put back as it was when func returns or raises.
+    """
+
+    input_fd, output_fd = sys.stdin.fileno(), sys.stdout.fileno()
+    columns, rows = os.get_terminal_size(output_fd)
+    attributes = termios.tcgetattr(input_fd)
+    try:
+        # keys come at once and are not echoed, Ctrl-C still interrupts
+        tty.setcbreak(input_fd)
+        os.write(output_fd, ENTER)
+        return func(AnsiTerminal(rows, columns, output_fd, input_fd), *args, **kwargs)
+    finally:
+        os.write(output_fd, LEAVE)
+        termios.tcsetattr(input_fd, termios.TCSADRAIN, attributes)
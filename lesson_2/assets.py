@@ -0,0 +1,70 @@
+import os
+import re
+
+from sprite import Sprite
+
+
+ANIMATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'animations')
+
+
+def _frame_number(name):
+    match = re.search(r'_(\d+)$', name)
+    return int(match.group(1)) if match else 0
+
+
+class AssetRegistry:
+    """Sprites of all animation files. Every file is read once, on load().
+
+    Sprites are available by file name without extension:
+       assets['game_over'], assets.frames('explosion') -> (explosion_1, explosion_2, ...)
+    """
+
+    def __init__(self, directory=ANIMATIONS_DIR):
+        self.directory = directory
+        self._sprites = {}
+        self._frames = {}
+
+    def __getitem__(self, name):
+        return self._sprites[name]
+
+    def __contains__(self, name):
+        return name in self._sprites
+
+    def names(self):
+        return sorted(self._sprites)
+
+    def load(self):
+        """Read and parse all *.txt files of the directory."""
+
+        for file_name in sorted(os.listdir(self.directory)):
+            name, extension = os.path.splitext(file_name)
+            if extension != '.txt':
+                continue
+            with open(os.path.join(self.directory, file_name), 'r') as f:
+                self._sprites[name] = Sprite(f.read())
+
+        self._frames.clear()
+        return self
+
+    def frames(self, prefix):
+        """Return numbered frames `prefix_1, prefix_2, ...` in the order of numbers."""
+
+        frames = self._frames.get(prefix)
+        if frames is None:
+            names = [name for name in self._sprites if name.rsplit('_', 1)[0] == prefix]
+            frames = tuple(self._sprites[name] for name in sorted(names, key=_frame_number))
+            self._frames[prefix] = frames
+        return frames
+
+    def verify(self, names=(), frames=()):
+        """Check that sprites and frame sequences exist and are not empty.
+        Frame sequences are cached as well, so nothing is computed during the game."""
+
+        missing = [name for name in names if name not in self._sprites]
+        missing += [prefix for prefix in frames if not self.frames(prefix)]
+        if missing:
+            raise FileNotFoundError(f'Animations not found in {self.directory}: {", ".join(missing)}')
+
+        empty = [name for name, sprite in self._sprites.items() if not sprite.height]
+        if empty:
+            raise ValueError(f'Empty animations in {self.directory}: {", ".join(empty)}')
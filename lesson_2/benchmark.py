@@ -0,0 +1,162 @@
+"""Benchmarks of the game loop on the in-memory canvas.
+
+    python benchmark.py --output benchmark.json
+    python benchmark.py --compare benchmark.json
+
+Every scenario runs with a fixed seed, so results of different commits
+can be compared. Results are written to a JSON file.
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import main
+from memory_canvas import MemoryCanvas
+
+
+SIZES = ((24, 80), (60, 200), (120, 400))
+
+
+def _fire_volley(shots):
+    """Hook spawning `shots` shots from the bottom at random columns every tick."""
+
+    def hook(canvas, rng):
+        rows, columns = canvas.getmaxyx()
+        for _ in range(shots):
+            main.shots.spawn(rows - 2, rng.randint(1, columns - 2), main.FIRE_SPEED)
+    return hook
+
+
+def _explosions(count):
+    """Hook spawning `count` explosions at random places every tick."""
+
+    def hook(canvas, rng):
+        rows, columns = canvas.getmaxyx()
+        for _ in range(count):
+            main.explosions.spawn(rng.randint(1, rows - 2), rng.randint(1, columns - 2))
+    return hook
+
+
+# name -> (start year, stars per cell of the sky, hook per tick)
+SCENARIOS = {
+    'idle_sky': (1957, 0.5, None),
+    'late_game': (2020, 0.05, None),
+    'sustained_fire': (2020, 0.05, _fire_volley(3)),
+    'mass_explosions': (2020, 0.05, _explosions(5)),
+}
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_scenario(name, rows, columns, ticks, seed=0, trace_memory=False, workers=0):
+    """Run the scenario, return dict of measurements."""
+
+    start_year, stars_density, hook = SCENARIOS[name]
+    main.STARS_DENSITY = stars_density
+    rng = random.Random(seed)
+
+    memory_canvas = MemoryCanvas(rows, columns)
+    memory_canvas.border()
+
+    if trace_memory:
+        tracemalloc.start()
+
+    canvas, canvas2 = main.setup(memory_canvas, seed, start_year, workers=workers)
+    durations = []
+    for _ in range(ticks):
+        started_at = time.perf_counter()
+        if hook:
+            hook(canvas, rng)
+        main.run_tick()
+        main.render(canvas, canvas2)
+        durations.append(time.perf_counter() - started_at)
+    main.simulation.close()
+
+    result = {
+        'ticks': ticks,
+        'ticks_per_second': ticks / sum(durations),
+        'tick_ms_p50': _percentile(durations, 0.5) * 1000,
+        'tick_ms_p90': _percentile(durations, 0.9) * 1000,
+        'tick_ms_p99': _percentile(durations, 0.99) * 1000,
+        'tick_ms_max': max(durations) * 1000,
+        'curses_calls_per_tick': memory_canvas.calls / ticks,
+        'cells_per_tick': canvas.cells / ticks,
+        'coroutines': len(main.scheduler),
+        'digest': memory_canvas.digest(),
+    }
+
+    if trace_memory:
+        result['peak_memory_kb'] = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+
+    return result
+
+
+def run_all(ticks, sizes=SIZES, scenarios=SCENARIOS, seed=0, workers=0):
+    results = {}
+    for name in scenarios:
+        for rows, columns in sizes:
+            key = f'{name}@{rows}x{columns}'
+            result = run_scenario(name, rows, columns, ticks, seed, workers=workers)
+            # tracemalloc slows the code down, so memory is measured by a separate run
+            result['peak_memory_kb'] = run_scenario(name, rows, columns, ticks, seed, True, workers)['peak_memory_kb']
+            results[key] = result
+            print(f'{key:32} {result["ticks_per_second"]:9.0f} ticks/s  '
+                  f'p99 {result["tick_ms_p99"]:7.2f} ms  '
+                  f'{result["curses_calls_per_tick"]:8.1f} calls/tick  '
+                  f'{result["peak_memory_kb"]:8.0f} KB', file=sys.stderr)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+def compare(results, baseline):
+    """Print changes of the main measurements against the baseline results."""
+
+    for key, result in results.items():
+        old = baseline.get('results', {}).get(key)
+        if old is None:
+            continue
+        changes = []
+        for metric in ('ticks_per_second', 'tick_ms_p99', 'curses_calls_per_tick', 'peak_memory_kb'):
+            if old.get(metric):
+                changes.append(f'{metric} {(result[metric] / old[metric] - 1) * 100:+.1f}%')
+        print(f'{key:32} ' + '  '.join(changes))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the game loop.')
+    parser.add_argument('--ticks', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help='run only these scenarios')
+    parser.add_argument('--output', default='benchmark.json', help='file to write results to')
+    parser.add_argument('--compare', help='results file to compare with')
+    parser.add_argument('--workers', type=int, default=0, help='simulation workers in the pool')
+    args = parser.parse_args()
+
+    results = run_all(args.ticks, scenarios=args.scenario or SCENARIOS, seed=args.seed, workers=args.workers)
+    report = {
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
@@ -0,0 +1,229 @@
+from screen_buffer import SubCanvas, fit_grid
+
+
+# cell of the layer showing what is under it
+TRANSPARENT = None
+
+
+class Layer:
+    """Screen sized grid of symbols, part of the picture the compositor puts together.
+
+    Cells nobody has drawn on are transparent, cells of the opaque layer are
+    blank instead. Drawing marks the cells for the compositor, nothing is sent
+    to the screen till compose().
+    Transient layer is cleared on every tick, what is on it is drawn anew
+    every tick, so moving objects do not erase themselves.
+    Everything else (beep...) is passed to the canvas of the compositor.
+    """
+
+    def __init__(self, compositor, rows, columns, transient=False, opaque=False):
+        self.compositor = compositor
+        self.transient = transient
+        self.opaque = opaque
+        self.rows, self.columns = rows, columns
+        self.bordered = False
+
+        self._fill = ' ' if opaque else TRANSPARENT
+        self._symbols = [[self._fill] * columns for _ in range(rows)]
+        self._attrs = [[0] * columns for _ in range(rows)]
+        # rows drawn on; for the transient layer row -> [(start, end)...] drawn since the last clear
+        self._rows = set()
+        self._segments = {}
+
+    def __getattr__(self, name):
+        return getattr(self.compositor.canvas, name)
+
+    def getmaxyx(self):
+        return self.rows, self.columns
+
+    def addstr(self, row, column, text, attr=0):
+        """Draw text on the layer. Text out of the layer is clipped."""
+
+        if not 0 <= row < self.rows:
+            return
+
+        if column < 0:
+            text = text[-column:]
+            column = 0
+        text = text[:self.columns - column]
+        if not text:
+            return
+
+        end = column + len(text)
+        self.compositor.written += end - column
+        if end - column == 1:
+            # stars and shots are single symbols
+            self._symbols[row][column] = text
+            self._attrs[row][column] = attr
+        else:
+            self._symbols[row][column:end] = text
+            self._attrs[row][column:end] = [attr] * len(text)
+
+        if self.transient:
+            segments = self._segments.get(row)
+            if segments is None:
+                self._segments[row] = [(column, end)]
+            else:
+                segments.append((column, end))
+        else:
+            self._rows.add(row)
+        self.compositor.touch(row, column, end)
+
+    addch = addstr
+
+    def derwin(self, begin_row, begin_column):
+        return SubCanvas(self, begin_row, begin_column)
+
+    def border(self):
+        """Put the border of the window on the layer.
+
+        The window draws the border itself, it covers the edges of all the layers.
+        """
+
+        self.bordered = True
+        self.compositor.border_changed = True
+
+    def clear(self):
+        """Clear what was drawn on the transient layer, only the cells drawn on are touched."""
+
+        touch = self.compositor.touch
+        for row, segments in self._segments.items():
+            symbols, attrs = self._symbols[row], self._attrs[row]
+            for start, end in segments:
+                symbols[start:end] = [self._fill] * (end - start)
+                attrs[start:end] = [0] * (end - start)
+                touch(row, start, end)
+        self._segments.clear()
+
+    def resize(self, rows, columns):
+        """Take the new size, content is kept where it fits."""
+
+        self._symbols = fit_grid(self._symbols, rows, columns, self._fill)
+        self._attrs = fit_grid(self._attrs, rows, columns, 0)
+        self._rows = {row for row in self._rows if row < rows}
+        self._segments = {row: [(start, min(end, columns)) for start, end in segments if start < columns]
+                          for row, segments in self._segments.items() if row < rows}
+        self.rows, self.columns = rows, columns
+        if self.bordered:
+            self.border()
+
+
+class Compositor:
+    """Put the layers together on the buffered canvas, upper layers cover the lower ones.
+
+    Layers mark the cells they change, compose() puts together only the span
+    of the marked cells in every row, so content that does not change costs
+    nothing per tick. The border is drawn by the window only when it changes,
+    cells under it are not put together at all.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.rows, self.columns = canvas.getmaxyx()
+        # bottom to top
+        self.layers = []
+        self.border_changed = False
+        # row -> [first column, last column + 1] changed since the last compose
+        self._dirty = {}
+
+        # statistics: cells drawn on the layers and cells put together
+        self.written = 0
+        self.composed = 0
+
+    def add_layer(self, transient=False, opaque=False):
+        """Add the layer over the layers already added."""
+
+        layer = Layer(self, self.rows, self.columns, transient, opaque)
+        self.layers.append(layer)
+        return layer
+
+    def touch(self, row, start, end):
+        """Mark the cells to be put together again."""
+
+        span = self._dirty.get(row)
+        if span is None:
+            self._dirty[row] = [start, end]
+        else:
+            if start < span[0]:
+                span[0] = start
+            if end > span[1]:
+                span[1] = end
+
+    def begin_tick(self):
+        for layer in self.layers:
+            if layer.transient:
+                layer.clear()
+
+    def resize(self):
+        """Follow the size of the canvas, everything is put together again on the next compose."""
+
+        rows, columns = self.canvas.getmaxyx()
+        if (rows, columns) == (self.rows, self.columns):
+            return
+
+        self.rows, self.columns = rows, columns
+        for layer in self.layers:
+            layer.resize(rows, columns)
+        self._dirty = {row: [0, columns] for row in range(rows)}
+
+    def compose(self):
+        """Send the changed cells to the canvas."""
+
+        canvas = self.canvas
+        bordered = any(layer.bordered for layer in self.layers)
+        first_row, last_row = (1, self.rows - 1) if bordered else (0, self.rows)
+        first_column, last_column = (1, self.columns - 1) if bordered else (0, self.columns)
+
+        for row, (start, end) in self._dirty.items():
+            start, end = max(start, first_column), min(end, last_column)
+            if first_row <= row < last_row and start < end:
+                symbols, attrs = _compose_row(self.layers, row, start, end)
+                canvas.put(row, start, symbols, attrs)
+                self.composed += end - start
+        self._dirty.clear()
+
+        if self.border_changed:
+            self.border_changed = False
+            canvas.border()
+
+
+def _compose_row(layers, row, start, end):
+    """Return symbols and attributes of the cells start..end of the row, layers are bottom to top."""
+
+    symbols = attrs = None
+    for layer in layers:
+        if layer.opaque:
+            # nothing under it is seen
+            symbols, attrs = layer._symbols[row][start:end], layer._attrs[row][start:end]
+            continue
+
+        if layer.transient:
+            segments = layer._segments.get(row)
+            if not segments:
+                continue
+        elif row not in layer._rows:
+            continue
+
+        if symbols is None:
+            symbols, attrs = [TRANSPARENT] * (end - start), [0] * (end - start)
+        layer_symbols, layer_attrs = layer._symbols[row], layer._attrs[row]
+
+        if layer.transient:
+            # everything drawn is opaque, so the segments drawn are copied as they are
+            for segment_start, segment_end in segments:
+                segment_start, segment_end = max(segment_start, start), min(segment_end, end)
+                if segment_start < segment_end:
+                    symbols[segment_start - start:segment_end - start] = layer_symbols[segment_start:segment_end]
+                    attrs[segment_start - start:segment_end - start] = layer_attrs[segment_start:segment_end]
+        else:
+            upper_symbols = layer_symbols[start:end]
+            attrs = [attr if upper is TRANSPARENT else upper_attr
+                     for upper, upper_attr, attr in zip(upper_symbols, layer_attrs[start:end], attrs)]
+            symbols = [symbol if upper is TRANSPARENT else upper for upper, symbol in zip(upper_symbols, symbols)]
+
+    if symbols is None:
+        return [' '] * (end - start), [0] * (end - start)
+    if TRANSPARENT in symbols:
+        # attributes of transparent cells are 0 already
+        symbols = [' ' if symbol is TRANSPARENT else symbol for symbol in symbols]
+    return symbols, attrs
@@ -1,8 +1,12 @@
+from sprite import Sprite
+
+
 SPACE_KEY_CODE = 32
 LEFT_KEY_CODE = 260
 RIGHT_KEY_CODE = 261
 UP_KEY_CODE = 259
 DOWN_KEY_CODE = 258
+RESIZE_KEY_CODE = 410
 
 
 def read_controls(canvas, speed=1):
@@ -36,33 +40,45 @@ def read_controls(canvas, speed=1):
     return rows_direction, columns_direction, space_pressed
 
 
-def draw_frame(canvas, start_row, start_column, text, negative=False):
-    """Draw multiline text fragment on canvas. Erase text instead of drawing if negative=True is specified."""
-    
+def draw_frame(canvas, start_row, start_column, frame, negative=False):
+    """Draw Sprite (or multiline text) on canvas. Erase it instead of drawing if negative=True is specified."""
+
+    if not isinstance(frame, Sprite):
+        frame = Sprite(frame)
+
     rows_number, columns_number = canvas.getmaxyx()
+    start_row, start_column = round(start_row), round(start_column)
 
-    for row, line in enumerate(text.splitlines(), round(start_row)):
+    for row, runs in enumerate(frame.runs, start_row):
         if row < 0:
             continue
 
         if row >= rows_number:
             break
 
-        for column, symbol in enumerate(line, round(start_column)):
+        for offset, symbols, blank in runs:
+            if negative:
+                symbols = blank
+
+            column = start_column + offset
             if column < 0:
-                continue
+                symbols = symbols[-column:]
+                column = 0
 
-            if column >= columns_number:
-                break
+            if column + len(symbols) > columns_number:
+                symbols = symbols[:columns_number - column]
 
-            symbol = symbol if not negative else ' '
-            canvas.addch(row, column, symbol)
+            if symbols:
+                canvas.addstr(row, column, symbols)
 
 
-def get_frame_size(text):
-    """Calculate size of multiline text fragment. Returns pair (rows number, colums number)"""
-    
-    lines = text.splitlines()
+def get_frame_size(frame):
+    """Calculate size of Sprite or multiline text fragment. Returns pair (rows number, colums number)"""
+
+    if isinstance(frame, Sprite):
+        return frame.height, frame.width
+
+    lines = frame.splitlines()
     rows = len(lines)
     columns = max([len(line) for line in lines])
-    return rows, columns
\ No newline at end of file
+    return rows, columns
@@ -0,0 +1,179 @@
+from curses_tools import draw_frame, get_frame_size
+from scheduler import sleep
+
+
+class Shot:
+    __slots__ = ('row', 'column', 'rows_speed', 'columns_speed', 'symbol', 'trail', 'stage', 'body', 'next_tick')
+
+
+class Explosion:
+    __slots__ = ('row', 'column', 'frames', 'frame', 'drawn', 'step', 'next_tick')
+
+
+class Shots:
+    """All the shots, moved and drawn by one coroutine.
+
+    Shot records come from the pool, no coroutine is made per shot.
+    The shot shows the muzzle flash for two ticks, then flies as a body of
+    the physics step till it leaves the canvas or hits an obstacle.
+    spawn() draws the first tick of the shot at once, so the shot goes
+    on the same ticks as it would in a coroutine of its own.
+    Canvas is the layer cleared every tick, every shot is drawn on every tick.
+    """
+
+    def __init__(self, canvas, bodies, simulation, pool, clock):
+        self.canvas = canvas
+        self.bodies = bodies
+        self.simulation = simulation
+        self.pool = pool
+        self.clock = clock
+        self._active = []
+
+    def __len__(self):
+        return len(self._active)
+
+    def spawn(self, row, column, rows_speed=-0.3, columns_speed=0, trail=True):
+        """Fire the shot. Return False if the pool is full and the shot is dropped."""
+
+        shot = self.pool.acquire()
+        if shot is None:
+            return False
+
+        shot.row, shot.column = row, column
+        shot.rows_speed, shot.columns_speed = rows_speed, columns_speed
+        shot.symbol = '-' if columns_speed else '|'
+        shot.trail = trail
+        shot.stage = 0
+        shot.body = None
+        shot.next_tick = self.clock() + 1
+
+        # muzzle flash is not drawn on lower quality, but takes the same time
+        if trail:
+            self.canvas.addstr(round(row), round(column), '*')
+        self._active.append(shot)
+        return True
+
+    async def animate(self):
+        active = self._active
+        while True:
+            await sleep()
+
+            now = self.clock()
+            kept = 0
+            for shot in active:
+                if shot.next_tick > now or self._advance(shot):
+                    shot.next_tick = max(shot.next_tick, now + 1)
+                    active[kept] = shot
+                    kept += 1
+            del active[kept:]
+
+    def _advance(self, shot):
+        """Do the tick of the shot. Return False if the shot is over."""
+
+        canvas = self.canvas
+        if shot.stage == 0:
+            if shot.trail:
+                canvas.addstr(round(shot.row), round(shot.column), 'O')
+            shot.stage = 1
+            return True
+
+        if shot.stage == 1:
+            shot.row += shot.rows_speed
+            shot.column += shot.columns_speed
+            canvas.beep()
+            shot.body = self.bodies.add(shot.row, shot.column, shot.rows_speed, shot.columns_speed)
+            self.simulation.add_shot(shot.body)
+            shot.stage = 2
+        else:
+            # moved by physics step, the obstacle hit is stopped by the step too
+            shot.row, shot.column = self.bodies.position(shot.body)
+            if self.simulation.hit(shot.body) is not None:
+                return self._finish(shot)
+
+        # size of the canvas is taken every tick to follow the terminal resize
+        rows, columns = canvas.getmaxyx()
+        if not (0 < shot.row < rows - 1 and 0 < shot.column < columns - 1):
+            return self._finish(shot)
+
+        canvas.addstr(round(shot.row), round(shot.column), shot.symbol)
+        return True
+
+    def _finish(self, shot):
+        self.simulation.remove_shot(shot.body)
+        self.bodies.remove(shot.body)
+        shot.body = None
+        self.pool.release(shot)
+        return False
+
+
+class Explosions:
+    """All the explosions, animated by one coroutine from pooled records.
+
+    Every frame of the explosion is shown for `step` ticks and hidden for
+    `step` ticks, on lower quality only every step-th frame is shown.
+    spawn() draws the first frame at once. Canvas is the layer cleared every
+    tick, the frame shown is drawn on every tick.
+    """
+
+    def __init__(self, canvas, frames, pool, clock):
+        self.canvas = canvas
+        self.frames = tuple(frames)
+        self.pool = pool
+        self.clock = clock
+        self._active = []
+        self._frames_by_step = {}
+
+    def __len__(self):
+        return len(self._active)
+
+    def spawn(self, center_row, center_column, step=1):
+        """Start the explosion. Return False if the pool is full and the explosion is dropped."""
+
+        explosion = self.pool.acquire()
+        if explosion is None:
+            return False
+
+        frames = self._frames_by_step.get(step)
+        if frames is None:
+            frames = self._frames_by_step[step] = self.frames[::step]
+
+        rows, columns = get_frame_size(frames[0])
+        explosion.row = center_row - rows / 2
+        explosion.column = center_column - columns / 2
+        explosion.frames = frames
+        explosion.frame = 0
+        explosion.drawn = True
+        explosion.step = step
+        explosion.next_tick = self.clock() + step
+
+        self.canvas.beep()
+        draw_frame(self.canvas, explosion.row, explosion.column, frames[0])
+        self._active.append(explosion)
+        return True
+
+    async def animate(self):
+        canvas = self.canvas
+        active = self._active
+        while True:
+            await sleep()
+
+            now = self.clock()
+            kept = 0
+            for explosion in active:
+                if explosion.next_tick <= now:
+                    if explosion.drawn:
+                        explosion.frame += 1
+                        explosion.drawn = False
+                        if explosion.frame == len(explosion.frames):
+                            self.pool.release(explosion)
+                            continue
+                    else:
+                        explosion.drawn = True
+                    explosion.next_tick = now + explosion.step
+
+                if explosion.drawn:
+                    draw_frame(canvas, explosion.row, explosion.column, explosion.frames[explosion.frame])
+
+                active[kept] = explosion
+                kept += 1
+            del active[kept:]
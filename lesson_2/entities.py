@@ -0,0 +1,118 @@
+GENERATION_SHIFT = 32
+SLOT_MASK = (1 << GENERATION_SHIFT) - 1
+
+
+class SlotMap:
+    """Values by compact integer ids with O(1) add, remove and lookup.
+
+    Values are stored densely. A removed value is replaced by the last one
+    (swap-remove), its slot goes to the free list and gets a new generation,
+    so the old id of the slot is not valid anymore.
+    Id is `generation << 32 | slot`.
+    """
+
+    def __init__(self):
+        self._values = []
+        self._value_slots = []
+        self._slot_indexes = []
+        self._generations = []
+        self._free_slots = []
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, key):
+        return self._index(key) is not None
+
+    def __iter__(self):
+        """Iterate over ids. It is safe to add and remove values during iteration."""
+
+        generations = self._generations
+        return iter([generations[slot] << GENERATION_SHIFT | slot for slot in self._value_slots])
+
+    def __getitem__(self, key):
+        index = self._index(key)
+        if index is None:
+            raise KeyError(key)
+        return self._values[index]
+
+    def __setitem__(self, key, value):
+        index = self._index(key)
+        if index is None:
+            raise KeyError(key)
+        self._values[index] = value
+
+    def get(self, key, default=None):
+        index = self._index(key)
+        return default if index is None else self._values[index]
+
+    def values(self):
+        return list(self._values)
+
+    def add(self, value):
+        """Add value, return its id."""
+
+        if self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            slot = len(self._slot_indexes)
+            self._slot_indexes.append(None)
+            self._generations.append(0)
+
+        self._slot_indexes[slot] = len(self._values)
+        self._values.append(value)
+        self._value_slots.append(slot)
+        return self._generations[slot] << GENERATION_SHIFT | slot
+
+    def remove(self, key):
+        """Remove value by id and return it."""
+
+        index = self._index(key)
+        if index is None:
+            raise KeyError(key)
+
+        value = self._values[index]
+        last_value = self._values.pop()
+        last_slot = self._value_slots.pop()
+        if index < len(self._values):
+            self._values[index] = last_value
+            self._value_slots[index] = last_slot
+            self._slot_indexes[last_slot] = index
+
+        slot = key & SLOT_MASK
+        self._slot_indexes[slot] = None
+        self._generations[slot] += 1
+        self._free_slots.append(slot)
+        return value
+
+    def _index(self, key):
+        slot = key & SLOT_MASK
+        if slot >= len(self._slot_indexes) or self._generations[slot] != key >> GENERATION_SHIFT:
+            return None
+        return self._slot_indexes[slot]
+
+
+class KillQueue:
+    """Ids to stop, in the order they were added. Adding the same id twice does nothing."""
+
+    def __init__(self):
+        self._keys = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def add(self, key):
+        self._keys[key] = None
+
+    def discard(self, key):
+        self._keys.pop(key, None)
+
+    def drain(self):
+        """Return all the ids and empty the queue."""
+
+        keys = list(self._keys)
+        self._keys.clear()
+        return keys
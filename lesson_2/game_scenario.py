@@ -1,27 +1,120 @@
-PHRASES = {
-    # Только на английском, Repl.it ломается на кириллице
-    1957: "First Sputnik",
-    1961: "Gagarin flew!",
-    1969: "Armstrong got on the moon!",
-    1971: "First orbital space station Salute-1",
-    1981: "Flight of the Shuttle Columbia",
-    1998: 'ISS start building',
-    2011: 'Messenger launch to Mercury',
-    2020: "Take the plasma gun! Shoot the garbage!",
-}
+import bisect
+import collections
+import itertools
+import json
+import os
+
+
+SCENARIOS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scenarios')
+DEFAULT_SCENARIO_PATH = os.path.join(SCENARIOS_DIR, 'default.json')
+
+
+class Phase(collections.namedtuple('Phase', 'year garbage_delay trash cum_weights speed')):
+    """Settings of the game from `year` till the next phase.
+
+    garbage_delay — ticks between new garbage, None for no garbage,
+    trash — names of the garbage sprites with cumulative weights (None if equal),
+    speed — (min, max) speed of the garbage.
+    """
+
+    __slots__ = ()
+
+    def choose_trash(self, rng):
+        if self.cum_weights is None:
+            return rng.choice(self.trash)
+        return rng.choices(self.trash, cum_weights=self.cum_weights)[0]
+
+    def choose_speed(self, rng):
+        low, high = self.speed
+        return low if low == high else rng.uniform(low, high)
+
+
+class Scenario:
+    """Timeline of the game compiled from the scenario file.
+
+    Phases are sorted by year, the phase of a year is found by bisect.
+    Status lines are made once per year and kept.
+
+    File is JSON:
+       {"phases": [{"year": 1961, "garbage_delay": 20, "trash": {"trash_large": 2, "trash_small": 1},
+                    "speed": [0.3, 0.7]}, ...],
+        "defaults": {...settings of the phases...},
+        "messages": {"1957": "First Sputnik", ...}}
+    Settings a phase does not have are taken from defaults. Before the first
+    phase the defaults are in force. Wrong settings raise ValueError naming
+    the phase: garbage_delay must be null or integer >= 1, a phase with
+    garbage needs trash, weights are positive, speed is [min, max].
+    """
+
+    def __init__(self, phases=(), defaults=None, messages=None):
+        defaults = dict(defaults or {})
+        self.default_phase = _compile_phase(None, defaults)
+        self.phases = sorted((_compile_phase(phase['year'], {**defaults, **phase}) for phase in phases),
+                             key=lambda phase: phase.year)
+        self._years = [phase.year for phase in self.phases]
+        self.messages = {int(year): message for year, message in (messages or {}).items()}
+        self._status_lines = {}
+
+    @classmethod
+    def load(cls, path=DEFAULT_SCENARIO_PATH):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data.get('phases', ()), data.get('defaults'), data.get('messages'))
+
+    def phase(self, year):
+        index = bisect.bisect_right(self._years, year) - 1
+        return self.phases[index] if index >= 0 else self.default_phase
+
+    def trash_names(self):
+        """Names of all the garbage sprites the scenario uses."""
+
+        phases = itertools.chain([self.default_phase], self.phases)
+        return sorted({name for phase in phases for name in phase.trash})
+
+    def status_line(self, year, extra=''):
+        """Year, its message and `extra` text, padded to erase the previous line."""
+
+        key = (year, extra)
+        line = self._status_lines.get(key)
+        if line is None:
+            line = "{} {}".format(year, self.messages.get(year, "...") + extra + " " * 30)
+            self._status_lines[key] = line
+        return line
+
+
+def _compile_phase(year, settings):
+    name = 'defaults' if year is None else f'phase of {year}'
+
+    garbage_delay = settings.get('garbage_delay')
+    if garbage_delay is not None and (not isinstance(garbage_delay, int) or isinstance(garbage_delay, bool)
+                                      or garbage_delay < 1):
+        # sleep(0) does not give the tick away, garbage would be launched forever in one tick
+        raise ValueError(f'Wrong garbage_delay {garbage_delay!r} in the {name}. Expects null or integer ticks >= 1.')
+
+    trash = settings.get('trash') or {}
+    if garbage_delay is not None and not trash:
+        raise ValueError(f'No trash in the {name}, garbage is launched every {garbage_delay} ticks.')
+    for trash_name, weight in trash.items():
+        if not isinstance(weight, (int, float)) or isinstance(weight, bool) or weight <= 0:
+            raise ValueError(f'Wrong weight {weight!r} of {trash_name} in the {name}. Expects positive number.')
+
+    names = tuple(trash)
+    weights = tuple(trash.values())
+    cum_weights = None
+    if len(set(weights)) > 1:
+        cum_weights = tuple(itertools.accumulate(weights))
+
+    low, high = settings.get('speed', (0.5, 0.5))
+    if low > high:
+        raise ValueError(f'Wrong speed [{low}, {high}] in the {name}. Expects [min, max].')
+    return Phase(year, garbage_delay, names, cum_weights, (low, high))
+
+
+DEFAULT_SCENARIO = Scenario.load()
+
+# Только на английском, Repl.it ломается на кириллице
+PHRASES = DEFAULT_SCENARIO.messages
+
 
 def get_garbage_delay_tics(year):
-    if year < 1961:
-        return None
-    elif year < 1969:
-        return 20
-    elif year < 1981:
-        return 14
-    elif year < 1995:
-        return 10
-    elif year < 2010:
-        return 8
-    elif year < 2020:
-        return 6
-    else:
-        return 2
\ No newline at end of file
+    return DEFAULT_SCENARIO.phase(year).garbage_delay
@@ -0,0 +1,133 @@
+"""Run the game without a terminal, as fast as possible.
+
+    python headless.py --ticks 3000 --seed 1 --size 40x120
+    python headless.py --replay session.log
+"""
+import argparse
+import asyncio
+import time
+
+import main
+from session_log import read_log
+from curses_tools import SPACE_KEY_CODE
+from memory_canvas import MemoryCanvas
+from profiler import TickProfiler
+from quality import LEVELS
+
+
+def run_headless(ticks, rows=24, columns=80, seed=0, keys=None, start_year=main.START_YEAR, profiler=None,
+                 use_asyncio=False, workers=0, pool=main.SIMULATION_POOL, record_path=None, replay_keys=None,
+                 quality_name='high', resizes=None, replay_resizes=None):
+    """Run the game loop for `ticks` ticks on the MemoryCanvas. Return the canvas.
+
+    keys maps tick number to the key codes pressed on that tick.
+    Same seed, size and keys give exactly the same game, with or without asyncio,
+    with any number of simulation workers and on any quality level.
+    Session can be recorded to record_path, keys and resizes of the recorded session
+    are given by replay_keys and replay_resizes.
+    With quality_name='auto' the screen depends on timings, the game itself does not.
+    resizes maps tick number to the (rows, columns) the terminal is resized to before that tick.
+    """
+
+    memory_canvas = MemoryCanvas(rows, columns, keys)
+    memory_canvas.border()
+
+    if use_asyncio:
+        asyncio.run(_run_async(memory_canvas, ticks, seed, start_year, profiler,
+                               workers=workers, pool=pool, record_path=record_path, replay_keys=replay_keys,
+                               replay_resizes=replay_resizes, quality_name=quality_name, resizes=resizes))
+        return memory_canvas
+
+    canvas, canvas2 = main.setup(memory_canvas, seed, start_year, profiler, workers=workers, pool=pool,
+                                 record_path=record_path, replay_keys=replay_keys, replay_resizes=replay_resizes,
+                                 quality_name=quality_name)
+
+    for tick in range(ticks):
+        _resize(memory_canvas, resizes, tick)
+        started_at = time.perf_counter()
+        main.run_tick()
+        main.present(canvas, canvas2, profiler, started_at, time.perf_counter(), overlay=False)
+        memory_canvas.next_tick()
+
+    main.teardown()
+    return memory_canvas
+
+
+async def _run_async(memory_canvas, ticks, seed, start_year, profiler, resizes, **options):
+    canvas, canvas2 = main.setup(memory_canvas, seed, start_year, profiler, use_asyncio=True, **options)
+
+    for tick in range(ticks):
+        _resize(memory_canvas, resizes, tick)
+        started_at = time.perf_counter()
+        await main.run_tick_async()
+        main.present(canvas, canvas2, profiler, started_at, time.perf_counter(), overlay=False)
+        memory_canvas.next_tick()
+
+    main.scheduler.close()
+    main.teardown()
+
+
+def _resize(memory_canvas, resizes, tick):
+    if resizes and tick in resizes:
+        memory_canvas.resize(*resizes[tick])
+        main.input_queue.request_resize()
+
+
+def fire_every(every, ticks):
+    """Scripted input: press SPACE every `every` ticks."""
+
+    return {tick: [SPACE_KEY_CODE] for tick in range(0, ticks, every)}
+
+
+def parse_size(size):
+    rows, columns = size.lower().split('x')
+    return int(rows), int(columns)
+
+
+def parse_resize(resize):
+    """TICK:ROWSxCOLUMNS -> (tick, (rows, columns))"""
+
+    tick, size = resize.split(':')
+    return int(tick), parse_size(size)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the game without a terminal.')
+    parser.add_argument('--ticks', type=int, help='1000 or all the ticks of the replayed session')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--size', type=parse_size, default=(24, 80), help='ROWSxCOLUMNS')
+    parser.add_argument('--year', type=int, default=main.START_YEAR, help='year to start with')
+    parser.add_argument('--fire-every', type=int, default=0, help='press SPACE every N ticks')
+    parser.add_argument('--profile', help='file to dump the profile to, in folded stacks format')
+    parser.add_argument('--asyncio', action='store_true', help='run the coroutines as asyncio tasks')
+    parser.add_argument('--workers', type=int, default=0, help='step physics and collisions in a pool of N workers')
+    parser.add_argument('--pool', choices=('thread', 'process'), default=main.SIMULATION_POOL)
+    parser.add_argument('--quality', choices=['auto', *(quality.name for quality in LEVELS)], default='high')
+    parser.add_argument('--resize', type=parse_resize, action='append', default=[],
+                        help='resize the terminal before the tick, TICK:ROWSxCOLUMNS')
+    parser.add_argument('--record', help='file to record the session to')
+    parser.add_argument('--replay', help='file of the recorded session to play, instead of seed, size and year')
+    args = parser.parse_args()
+
+    replay_keys = replay_resizes = None
+    if args.replay:
+        header, replay_keys, replay_resizes, ticks = read_log(args.replay)
+        args.seed, args.size, args.year = header.seed, (header.rows, header.columns), header.start_year
+        args.ticks = args.ticks or ticks
+    args.ticks = args.ticks or 1000
+
+    keys = fire_every(args.fire_every, args.ticks) if args.fire_every else None
+    profiler = TickProfiler() if args.profile else None
+    started_at = time.perf_counter()
+    canvas = run_headless(args.ticks, *args.size, args.seed, keys, args.year, profiler, args.asyncio,
+                          args.workers, args.pool, args.record, replay_keys, args.quality, dict(args.resize),
+                          replay_resizes)
+    duration = time.perf_counter() - started_at
+
+    print('\n'.join(canvas.lines()))
+    print(f'year {main.year}, quality {main.quality.name}, digest {canvas.digest()}, {args.ticks / duration:.0f} ticks/s')
+    print('pools ' + ', '.join(f"{name} {stats['peak']}/{stats['size']}" for name, stats in main.pool_stats().items()))
+
+    if profiler:
+        profiler.dump(args.profile)
+        print(profiler.overlay())
@@ -0,0 +1,108 @@
+import collections
+import selectors
+import time
+
+from curses_tools import SPACE_KEY_CODE, LEFT_KEY_CODE, RIGHT_KEY_CODE, UP_KEY_CODE, DOWN_KEY_CODE, RESIZE_KEY_CODE
+
+
+BUFFER_SIZE = 256
+
+KeyEvent = collections.namedtuple('KeyEvent', 'code time tick')
+
+
+class InputQueue:
+    """Ring buffer of timestamped key presses.
+
+    poll() is called at every tick boundary and moves all the pending keys
+    of the canvas to the buffer. Game systems consume() the events when they
+    need them, so keys are not lost whatever their own cadence is.
+    If the terminal file descriptor is given, getch is called only when the
+    selector says there is something to read.
+    With the recorder, key codes are recorded with the tick they are consumed on.
+    Terminal resize is not a key, it only sets the `resized` flag.
+    """
+
+    def __init__(self, canvas, fd=None, size=BUFFER_SIZE, clock=time.monotonic, recorder=None):
+        self.canvas = canvas
+        self.clock = clock
+        self.recorder = recorder
+        self.events = collections.deque(maxlen=size)
+        self.dropped = 0
+        # tick of the last poll, events are consumed on it
+        self.tick = 0
+        self.resized = False
+
+        self._selector = None
+        if fd is not None:
+            self._selector = selectors.DefaultSelector()
+            self._selector.register(fd, selectors.EVENT_READ)
+
+    def __len__(self):
+        return len(self.events)
+
+    def push(self, code, tick):
+        if len(self.events) == self.events.maxlen:
+            self.dropped += 1
+        self.events.append(KeyEvent(code, self.clock(), tick))
+
+    def poll(self, tick):
+        """Read all the keys pressed since the last poll."""
+
+        self.tick = tick
+        if self._selector is not None and not self._selector.select(0):
+            return
+
+        while True:
+            code = self.canvas.getch()
+            if code == -1:
+                # https://docs.python.org/3/library/curses.html#curses.window.getch
+                break
+            if code == RESIZE_KEY_CODE:
+                self.resized = True
+                continue
+            self.push(code, tick)
+
+    def request_resize(self):
+        """Terminal size has changed, it is taken on the next tick."""
+
+        self.resized = True
+
+    def consume(self):
+        """Return all the buffered events and empty the buffer."""
+
+        events = list(self.events)
+        self.events.clear()
+        if self.recorder is not None and events:
+            self.recorder.record(self.tick, [event.code for event in events])
+        return events
+
+    def close(self):
+        if self._selector is not None:
+            self._selector.close()
+
+
+def _limit(value):
+    return max(-1, min(1, value))
+
+
+def read_events(events, speed=1):
+    """Fold key events to controls state: (rows direction, columns direction, shots number).
+
+    Opposite keys cancel each other, every SPACE press is a shot.
+    """
+
+    rows_direction = columns_direction = shots = 0
+
+    for event in events:
+        if event.code == UP_KEY_CODE:
+            rows_direction -= 1
+        elif event.code == DOWN_KEY_CODE:
+            rows_direction += 1
+        elif event.code == RIGHT_KEY_CODE:
+            columns_direction += 1
+        elif event.code == LEFT_KEY_CODE:
+            columns_direction -= 1
+        elif event.code == SPACE_KEY_CODE:
+            shots += 1
+
+    return _limit(rows_direction) * speed, _limit(columns_direction) * speed, shots
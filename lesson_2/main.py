@@ -1,138 +1,152 @@
-import time
 import asyncio
+import math
+import os
+import sys
+import time
 import curses
 import random
-import uuid
-from game_scenario import get_garbage_delay_tics, PHRASES
-from curses_tools import get_frame_size, draw_frame, read_controls
-from physics import update_speed
+import signal
+from game_scenario import Scenario, DEFAULT_SCENARIO_PATH
+from curses_tools import get_frame_size, draw_frame
+from input_events import InputQueue, read_events
+from assets import AssetRegistry
+from physics import update_speed, Bodies
 from obstacle import Obstacle
+from spatial import ObstacleIndex
+from entities import SlotMap, KillQueue
+from starfield import StarField
+from effects import Shot, Shots, Explosion, Explosions
+from pools import Pool
+from scheduler import Scheduler, AsyncioScheduler, sleep
+from simulation import Simulation
+from session_log import Recorder, ReplayInput, read_log
+from quality import LEVELS, QualityController, level_by_name
+from profiler import ProfiledScheduler, TickProfiler
+from pacing import FramePacer
+from screen_buffer import BufferedCanvas
+from compositor import Compositor
+import ansi_terminal
 
 
 TIC_TIMEOUT = 0.1
-STARS_DENSITY = 100
+# what to do with missed ticks when the loop falls behind: 'merge' or 'drop'
+CATCH_UP_POLICY = 'merge'
+MAX_CATCH_UP_TICKS = 5
+# stars per cell of the sky
+STARS_DENSITY = 0.05
 STARS_SYMBOLS = '+*.:'
 FIRE_SPEED = -0.8
 RAW_SPACE_SPEED = 5
 COLUMN_SPACE_SPEED = 5
-
-year = 1963
-
-
-coroutines = []
-obstacles = {}
-obstacles_coroutines = {}
-obstacles_to_stop = []
+SHIP_FRAME_TICKS = 2
+# check all the animations are in place before the game starts
+VERIFY_ASSETS = True
+# set ASYNC_WARS_PROFILE=<file> to show profiler line and dump the profile to the file on exit
+PROFILE_PATH = os.environ.get('ASYNC_WARS_PROFILE')
+# set ASYNC_WARS_ASYNCIO=1 to run the game coroutines as tasks on asyncio event loop
+USE_ASYNCIO = bool(os.environ.get('ASYNC_WARS_ASYNCIO'))
+# set ASYNC_WARS_WORKERS=<number> to step physics and collisions in a pool while the frame is rendered
+SIMULATION_WORKERS = int(os.environ.get('ASYNC_WARS_WORKERS', 0))
+# pool of 'thread' or 'process' workers
+SIMULATION_POOL = os.environ.get('ASYNC_WARS_POOL', 'thread')
+# set ASYNC_WARS_RECORD=<file> to record the session, ASYNC_WARS_REPLAY=<file> to play the recorded one
+RECORD_PATH = os.environ.get('ASYNC_WARS_RECORD')
+REPLAY_PATH = os.environ.get('ASYNC_WARS_REPLAY')
+# 'auto' to adapt the quality to the load, or name of the fixed quality level
+QUALITY = os.environ.get('ASYNC_WARS_QUALITY', 'auto')
+# objects of garbage, shots and explosions are taken from pools of these sizes
+OBSTACLES_POOL_SIZE = 128
+SHOTS_POOL_SIZE = 128
+EXPLOSIONS_POOL_SIZE = 32
+# what to do when a pool is empty: 'grow', 'drop' the new object or raise 'error'
+POOL_OVERFLOW = os.environ.get('ASYNC_WARS_POOL_OVERFLOW', 'grow')
+# 'curses', or 'ansi' to draw by raw escape sequences with one write to the terminal per frame
+OUTPUT = os.environ.get('ASYNC_WARS_OUTPUT', 'curses')
+# set ASYNC_WARS_SCENARIO=<file> to play another timeline of the game
+SCENARIO_PATH = os.environ.get('ASYNC_WARS_SCENARIO', DEFAULT_SCENARIO_PATH)
+
+START_YEAR = 1963
+
+year = START_YEAR
+rng = random.Random()
+# stars are placed by their own generator, so the size of the sky does not change the game
+stars_rng = random.Random()
+
+
+scheduler = Scheduler()
+obstacles = ObstacleIndex()
+obstacles_coroutines = SlotMap()
+obstacles_to_stop = KillQueue()
+starfield = None
+bodies = Bodies()
+simulation = None
+input_queue = None
+recorder = None
+quality = LEVELS[0]
+quality_controller = None
+# TickProfiler of the game, parts of the tick out of the coroutines are timed for it
+game_profiler = None
+pacer = None
+frame_number = 0
+screen = None
+compositor = None
+overlay_layer = None
+scenario = None
+obstacles_pool = None
+shots = None
+explosions = None
+assets = AssetRegistry()
 
 
 """ ############################# """
 """ GENERAL FUNCTIONS """
 
 
-async def sleep(tics=1):
-    for _ in range(tics):
-        await asyncio.sleep(0)
-
-
 async def increment_year(canvas):
     """ Increment year to run the scenario of the game """
 
     global year
 
+    shown_quality = None
     while True:
+        # status line stays on its layer, it is drawn again only when the year or the quality changes
+        message = None
         for _ in range(15):
-            if year in PHRASES.keys():
-                message = "{} {}".format(year, PHRASES[year]+" "*30)
-            else:
-                message = "{} {}".format(year, "..."+" "*30)
-            canvas.addstr(0, 0, message, curses.A_DIM)
-            await asyncio.sleep(0)
+            if message is None or quality.name != shown_quality:
+                shown_quality = quality.name
+                extra = "  quality: {}".format(quality.name) if quality_controller is not None else ""
+                message = scenario.status_line(year, extra)
+                canvas.addstr(0, 0, message, curses.A_DIM)
+            await sleep()
         year += 1
 
 
 async def show_gameover(canvas):
 
-    with open('animations/game_over.txt', "r") as f:
-          game_over_label = f.read()
-    
-    # canvas sizes
-    max_row, max_column = canvas.getmaxyx()
-    middle_row = round(max_row/2)
-    middle_column = round(max_column/2)    
-
+    game_over_label = assets['game_over']
     rows, columns = get_frame_size(game_over_label)
-    corner_row = middle_row - rows / 2
-    corner_column = middle_column - columns / 2
 
     while True:
-        draw_frame(canvas, corner_row, corner_column, game_over_label)
-        await asyncio.sleep(0)
+        # canvas sizes, taken every tick to follow the terminal resize
+        max_row, max_column = canvas.getmaxyx()
+        middle_row = round(max_row/2)
+        middle_column = round(max_column/2)
 
+        corner_row = middle_row - rows / 2
+        corner_column = middle_column - columns / 2
 
-""" ############################# """
-""" SKY """
-
-
-async def blink(canvas, row, column, symbol='*'):
-    """Blink functiton for the sky animations"""
-
-    # random pause before start
-    ticks_before_start = random.randint(0, 10)
-    # 2 seconds DIM
-    ticks_with_dim = 20
-    # 0.3 second original 1
-    ticks_with_original_1 = 3
-    # 0.3 second bold
-    ticks_with_bold = 3
-    # 0.5 second original 2
-    ticks_with_original_2 = 5
-
-    while True:
-          await sleep(ticks_before_start)
-
-          canvas.addstr(row, column, symbol, curses.A_DIM)
-          await sleep(ticks_with_dim)
-
-          canvas.addstr(row, column, symbol)
-          await sleep(ticks_with_original_1)
-
-          canvas.addstr(row, column, symbol, curses.A_BOLD)
-          await sleep(ticks_with_bold)
-
-          canvas.addstr(row, column, symbol)
-          await sleep(ticks_with_original_2)
+        draw_frame(canvas, corner_row, corner_column, game_over_label)
+        await sleep()
 
 
 """ ############################# """
 """ OPERATE WITH OBSTACLES AND COLLISIONS """
 
 
-async def explode(canvas, center_row, center_column):
-
-    # read frames for the obstacle
-    frames = []
-    for i in range(4):
-        path = "animations/explosion_{}.txt".format(i+1)
-        with open(path, "r") as f:
-              frames.append(f.read())
-    
-    rows, columns = get_frame_size(frames[0])
-    corner_row = center_row - rows / 2
-    corner_column = center_column - columns / 2
-    curses.beep()
-
-    for frame in frames:
-        draw_frame(canvas, corner_row, corner_column, frame)
-        await asyncio.sleep(0)
-        draw_frame(canvas, corner_row, corner_column, frame, negative=True)
-        await asyncio.sleep(0)
-    
-    return
-
-
-async def fly_garbage(canvas, column, garbage_frame, obs_id, speed=0.5):
+async def fly_garbage(canvas, column, garbage_frame, obs_id, obs, speed=0.5):
     """ Animate garbage, flying from top to bottom. 
-    Сolumn position will stay same, as specified on start."""
+    Сolumn position will stay same, as specified on start.
+    obs is the Obstacle taken from the pool, it goes back there when garbage is gone."""
     
     frame_row, frame_column = get_frame_size(garbage_frame)
 
@@ -142,51 +156,68 @@ async def fly_garbage(canvas, column, garbage_frame, obs_id, speed=0.5):
 
     row = 1
 
-    obs = Obstacle(row, column, frame_row, frame_column)
+    obs.row, obs.column, obs.frame_row, obs.frame_column = row, column, frame_row, frame_column
+    obs.mask = garbage_frame.mask
     obstacles[obs_id] = obs
+    body = bodies.add(row, column, speed, 0)
+    simulation.add_target(obs_id, body, (frame_row, frame_column), obs.mask)
 
     try:
-        while row < rows_number:
+        while obs.row < rows_number:
             draw_frame(canvas, obs.row, obs.column, garbage_frame)
-            await asyncio.sleep(0)
-            draw_frame(canvas, obs.row, obs.column, garbage_frame, negative=True)
-            obs.row += speed
+            await sleep()
+            # moved by physics step
+            obs.row, obs.column = bodies.position(body)
+
+            # terminal could be resized
+            rows_number, columns_number = canvas.getmaxyx()
+            if obs.column > columns_number - frame_column - 1:
+                obs.column = max(columns_number - frame_column - 1, 0)
+                bodies.place(body, obs.row, obs.column)
+            obstacles.moved(obs_id)
         else:
             obstacles.pop(obs_id)
+            obstacles_coroutines.remove(obs_id)
+            simulation.remove_target(obs_id)
+            bodies.remove(body)
+            obstacles_pool.release(obs)
     except asyncio.CancelledError:
-        draw_frame(canvas, obs.row, obs.column, garbage_frame, negative=True)
-        coroutines.append(explode(canvas, 
-                          obs.row + round(frame_row / 2), 
-                          obs.column + round(frame_column / 2))
-                         )
+        explosions.spawn(obs.row + round(frame_row / 2),
+                         obs.column + round(frame_column / 2),
+                         quality.explosion_step)
         obstacles.pop(obs_id)
-        obstacles_to_stop.remove(obs_id)
+        obstacles_coroutines.remove(obs_id)
+        simulation.remove_target(obs_id)
+        bodies.remove(body)
+        obstacles_pool.release(obs)
         return
 
 
-async def run_asteroid_field(canvas, max_column):
-    """Add random garbage"""
+async def run_asteroid_field(canvas):
+    """Add random garbage as the scenario says"""
     global year
-    # frames
-    trashes = []
     # random pause before start
-    ticks_before_start = random.randint(0, 10)
-    with open('animations/trash_large.txt', "r") as f:
-          trashes.append(f.read())
-    with open('animations/trash_small.txt', "r") as f:
-          trashes.append(f.read())
-    
+    ticks_before_start = rng.randint(0, 10)
+
     while True:
-        if get_garbage_delay_tics(year) == None:
-            await asyncio.sleep(0)
+        phase = scenario.phase(year)
+        if phase.garbage_delay is None:
+            await sleep()
         else:
-            await sleep(get_garbage_delay_tics(year))
+            await sleep(phase.garbage_delay)
 
-            trash = random.choice(trashes)
-            column = random.randint(1, max_column)
-            obs_id = str(uuid.uuid4())
-            obstacles_coroutines[obs_id] = fly_garbage(canvas, column, trash, obs_id)
-            coroutines.append(obstacles_coroutines[obs_id])
+            trash = assets[phase.choose_trash(rng)]
+            max_row, max_column = canvas.getmaxyx()
+            column = rng.randint(1, max_column)
+            speed = phase.choose_speed(rng)
+
+            obs = obstacles_pool.acquire()
+            if obs is None:
+                # too much garbage already, this one is not launched
+                continue
+            obs_id = obstacles_coroutines.add(None)
+            obstacles_coroutines[obs_id] = fly_garbage(canvas, column, trash, obs_id, obs, speed)
+            scheduler.spawn(obstacles_coroutines[obs_id])
 
 
 """ ############################# """
@@ -196,153 +227,403 @@ async def run_asteroid_field(canvas, max_column):
 async def animate_spaceship(canvas, row, column, frames):
     """Spaceship animation with keyboard control and limitts"""
 
-    # get max size of the canvas
-    rows, columns = canvas.getmaxyx()
-    max_row, max_column = rows - 1, columns - 1
     row_speed = column_speed = 0
+    rows_direction = columns_direction = 0
 
     while True:
         for frame in frames:
 
-            # read keyboard and move ship or fire
-            rows_direction, columns_direction, space = read_controls(canvas, 1)
+            # move ship by the keys pressed during the previous frame
             row_speed, column_speed = update_speed(row_speed, column_speed,
                                                    rows_direction, columns_direction,
                                                    RAW_SPACE_SPEED, COLUMN_SPACE_SPEED)
+            rows_direction = columns_direction = 0
             row += row_speed
             column += column_speed
 
-            # calculate max coordinates for ship
+            # calculate max coordinates for ship, size of the canvas can change with the terminal
+            rows, columns = canvas.getmaxyx()
+            max_row, max_column = rows - 1, columns - 1
             frame_row, frame_column = get_frame_size(frame)
             row = min(row, max_row - frame_row)
             row = max(1, row)
             column = min(column, max_column - frame_column)
             column = max(1, column)
 
-            if space:
-                coroutines.append(fire(canvas, row, column + round(frame_column/2), FIRE_SPEED))
-
             # draw frame for 0.2 second
             draw_frame(canvas, row, column, frame, negative=False)
 
-            # check collision
-            for obs_id, obs in obstacles.items():
-                if obs.has_collision((row, column)):
-                    obstacles_to_stop.append(obs_id)
-                    coroutines.append(show_gameover(canvas))
-                    draw_frame(canvas, row, column, frame, negative=True)
-                    return
+            # check collision of the ship shape with the garbage shapes
+            hits = obstacles.hits_box((row, column), (frame_row, frame_column), frame.mask)
+            if hits:
+                obstacles_to_stop.add(hits[0])
+                scheduler.spawn(show_gameover(overlay_layer))
+                return
 
-            # check collision   
-            await sleep(2)
+            for tick in range(SHIP_FRAME_TICKS):
+                if tick:
+                    # the layer of the ship is cleared every tick
+                    draw_frame(canvas, row, column, frame)
+                await sleep()
 
-            # erase frame
-            draw_frame(canvas, row, column, frame, negative=True)
+                # keys are read every tick, so every shot goes off without waiting for the next frame
+                rows_pressed, columns_pressed, shots_number = read_events(input_queue.consume())
+                rows_direction = max(-1, min(1, rows_direction + rows_pressed))
+                columns_direction = max(-1, min(1, columns_direction + columns_pressed))
+                for _ in range(shots_number):
+                    shots.spawn(row, column + round(frame_column/2), FIRE_SPEED, trail=quality.trail)
 
 
-async def fire(canvas, start_row, start_column, rows_speed=-0.3, columns_speed=0):
-    """Display animation of gun shot. Direction and speed can be specified."""
+""" ############################# """
+""" MAIN """
 
-    row, column = start_row, start_column
 
-    canvas.addstr(round(row), round(column), '*')
-    await asyncio.sleep(0)
+def setup(canvas, seed=None, start_year=START_YEAR, profiler=None, input_fd=None, use_asyncio=False,
+          workers=0, pool=SIMULATION_POOL, record_path=None, replay_keys=None, replay_resizes=None,
+          quality_name=LEVELS[0].name, scenario_path=SCENARIO_PATH):
+    """Reset the game state and start the game coroutines on the canvas.
+    Return the buffered canvas and the subwindow for the year.
+
+    With use_asyncio=True coroutines run as asyncio tasks, setup must be called
+    inside the running event loop then.
+    With workers > 0 physics and collisions are stepped in a pool of `pool` workers.
+    With record_path the session is recorded to the file. With replay_keys,
+    {tick: key codes} read from the log, keys come from there instead of the canvas,
+    the canvas is resized on the ticks of replay_resizes, {tick: (rows, columns)}.
+    quality_name is the name of the quality level, or 'auto' to adapt it to the load.
+    Quality changes only the drawing, the game goes the same on any level.
+    scenario_path is the file with the timeline of the game.
+    """
+
+    global year, scheduler, obstacles, obstacles_coroutines, obstacles_to_stop, starfield, bodies
+    global input_queue, simulation, recorder, quality, quality_controller, frame_number, screen, scenario
+    global obstacles_pool, shots, explosions, compositor, overlay_layer, game_profiler
+
+    if seed is None:
+        # explicit seed, so the session can be recorded
+        seed = random.getrandbits(63)
+
+    year = start_year
+    game_profiler = profiler
+    if use_asyncio:
+        scheduler = AsyncioScheduler(profiler)
+    else:
+        scheduler = ProfiledScheduler(profiler) if profiler else Scheduler()
+    bodies = Bodies()
+    if simulation is not None:
+        simulation.close()
+    simulation = Simulation(bodies, workers, pool)
+    obstacles = ObstacleIndex()
+    obstacles_coroutines = SlotMap()
+    obstacles_to_stop = KillQueue()
+    rng.seed(seed)
+    stars_rng.seed(f'stars {seed}')
+
+    # everything is drawn to the buffer, only changed cells go to curses
+    window = canvas
+    canvas = screen = BufferedCanvas(window)
+    recorder = Recorder(record_path, seed, *canvas.getmaxyx(), start_year) if record_path else None
+    if replay_keys is not None:
+        input_queue = ReplayInput(replay_keys, replay_resizes, window)
+    else:
+        input_queue = InputQueue(canvas, input_fd, recorder=recorder)
+
+    # picture is put together from the layers, only the changed cells of the layers go to the buffer
+    compositor = Compositor(canvas)
+    sky_layer = compositor.add_layer(opaque=True)
+    # status line is drawn only when it changes, so it has a layer of its own over the blinking stars
+    status_layer = compositor.add_layer()
+    entity_layer = compositor.add_layer(transient=True)
+    overlay_layer = compositor.add_layer(transient=True)
+    compositor.add_layer().border()
 
-    canvas.addstr(round(row), round(column), 'O')
-    await asyncio.sleep(0)
-    canvas.addstr(round(row), round(column), ' ')
+    # second canvas (subwindow) for the writings about year
+    canvas2 = status_layer.derwin(1, 1)
 
-    row += rows_speed
-    column += columns_speed
 
-    symbol = '-' if columns_speed else '|'
+    # read all the frames and the scenario before the game, no files are read during the game
+    assets.load()
+    scenario = Scenario.load(scenario_path)
+    if VERIFY_ASSETS:
+        assets.verify(['game_over', *scenario.trash_names()], ['explosion', 'rocket_frame'])
 
-    rows, columns = canvas.getmaxyx()
-    max_row, max_column = rows - 1, columns - 1
+    frames = assets.frames('rocket_frame')
 
-    curses.beep()
 
-    while 0 < row < max_row and 0 < column < max_column:
-        canvas.addstr(round(row), round(column), symbol)
-        await asyncio.sleep(0)
-        canvas.addstr(round(row), round(column), ' ')
-        row += rows_speed
-        column += columns_speed
+    # canvas sizes
+    max_row, max_column = canvas.getmaxyx()
+    middle_row = round(max_row/2)
+    middle_column = round(max_column/2)    
+    
+    # start for the sky
+    starfield = StarField.generate(stars_rng, max_row, max_column, STARS_DENSITY, STARS_SYMBOLS)
+    scheduler.spawn(starfield.blink(sky_layer))
 
-        for obs_id, obs in obstacles.items():
-            if obs.has_collision((row, column)):
-                obstacles_to_stop.append(obs_id)
-                return
+    frame_number = 0
+    if quality_name == 'auto':
+        quality_controller = QualityController(TIC_TIMEOUT)
+        set_quality(quality_controller.quality)
+    else:
+        quality_controller = None
+        set_quality(LEVELS[level_by_name(quality_name)])
 
+    # spaceship
+    scheduler.spawn(animate_spaceship(entity_layer, middle_row, middle_column, frames))
 
-""" ############################# """
-""" MAIN """
+    # add random garbage
+    scheduler.spawn(run_asteroid_field(entity_layer))
 
+    # shots and explosions are drawn by one coroutine each
+    clock = lambda: scheduler.tick_number
+    obstacles_pool = Pool(lambda: Obstacle(0, 0, 0, 0, None), OBSTACLES_POOL_SIZE, POOL_OVERFLOW)
+    shots = Shots(entity_layer, bodies, simulation, Pool(Shot, SHOTS_POOL_SIZE, POOL_OVERFLOW), clock)
+    scheduler.spawn(shots.animate())
+    explosions = Explosions(entity_layer, assets.frames('explosion'), Pool(Explosion, EXPLOSIONS_POOL_SIZE, POOL_OVERFLOW),
+                            clock)
+    scheduler.spawn(explosions.animate())
 
-def draw(canvas):
-    """Main draw functions"""
+    # year increment
+    scheduler.spawn(increment_year(canvas2))
 
-    # canvas settings
-    canvas.border()
-    curses.curs_set(False)
-    canvas.nodelay(True)
+    return canvas, canvas2
+
+
+def resize():
+    """Follow the new size of the terminal.
+
+    The buffer and the layers take the new size, the whole screen is sent on the next refresh.
+    Only the stars out of the sky move, new part of the sky gets its own stars.
+    New size is recorded to the session log, the replay resizes on the same tick.
+    Garbage, shots and the ship read the canvas size every tick and clip themselves.
+    """
+
+    if not screen.resize():
+        return
+    compositor.resize()
+
+    max_row, max_column = screen.getmaxyx()
+    if recorder is not None:
+        recorder.record_resize(scheduler.tick_number, max_row, max_column)
+    if max_row > 2 and max_column > 2:
+        starfield.fit(stars_rng, max_row, max_column, STARS_DENSITY, STARS_SYMBOLS)
+        set_quality(quality)
+
+
+def _on_terminal_resize(signum, frame):
+    # SIGWINCH handler replaces the curses one, so the terminal is told about the new size here
+    columns, rows = os.get_terminal_size(sys.stdin.fileno())
+    if OUTPUT == 'ansi':
+        screen.canvas.resize(rows, columns)
+    else:
+        curses.resizeterm(rows, columns)
+    input_queue.request_resize()
+
+
+def _prepare_tick():
+    # moving objects are drawn anew every tick
+    started_at = time.perf_counter()
+    compositor.begin_tick()
+    cleared_at = time.perf_counter()
+
+    input_queue.poll(scheduler.tick_number)
+    if input_queue.resized:
+        input_queue.resized = False
+        resize()
+
+    # move garbage and shots, coroutines read their new positions
+    stepped_from = time.perf_counter()
+    for obs_id in simulation.step():
+        obstacles_to_stop.add(obs_id)
+    if game_profiler is not None:
+        game_profiler.add_part('layers', cleared_at - started_at)
+        game_profiler.add_part('physics', time.perf_counter() - stepped_from)
+
+    for obs_id in obstacles_to_stop.drain():
+        # obstacle could have flown away already
+        coroutine = obstacles_coroutines.get(obs_id)
+        if coroutine is not None:
+            scheduler.cancel(coroutine)
+
+
+def run_tick():
+    """Run one tick of the game simulation."""
+
+    _prepare_tick()
+    scheduler.tick()
+    # next step goes on in the pool while this tick is rendered
+    simulation.submit()
+
+
+async def run_tick_async():
+    """Run one tick of the game simulation on the asyncio scheduler."""
+
+    _prepare_tick()
+    await scheduler.tick()
+    simulation.submit()
+
+
+def set_quality(new_quality):
+    global quality
+
+    quality = new_quality
+    starfield.set_visible(round(len(starfield) * quality.stars))
+
+
+def present(canvas, canvas2, profiler=None, started_at=None, simulated_at=None, overlay=True):
+    """Render the frame unless it is batched with the next ones, then adapt the quality to the load."""
+
+    global frame_number
+
+    frame_number += 1
+    cells = canvas.cells
+    if frame_number % quality.refresh_every == 0:
+        render(canvas, canvas2, profiler, started_at, simulated_at, overlay)
+
+    if quality_controller is not None:
+        if quality_controller.update(time.perf_counter() - started_at, canvas.cells - cells):
+            set_quality(quality_controller.quality)
+
+
+def pool_stats():
+    """Statistics of the pools, to size them for the peak load."""
+
+    return {
+        'obstacles': obstacles_pool.stats(),
+        'shots': shots.pool.stats(),
+        'explosions': explosions.pool.stats(),
+    }
+
+
+def teardown():
+    """Stop the simulation workers and close the session log."""
+
+    if simulation is not None:
+        simulation.close()
+    if input_queue is not None:
+        input_queue.close()
+    if recorder is not None:
+        recorder.close(scheduler.tick_number)
+
+
+def start_session(canvas, profiler=None, use_asyncio=False):
+    """Set the game up as the environment asks: new session or replay of the recorded one.
+    Return the buffered canvas, the subwindow for the year and the number of ticks to play.
+    """
+
+    if not REPLAY_PATH:
+        canvas, canvas2 = setup(canvas, profiler=profiler, input_fd=sys.stdin.fileno(), use_asyncio=use_asyncio,
+                                workers=SIMULATION_WORKERS, record_path=RECORD_PATH, quality_name=QUALITY)
+        signal.signal(signal.SIGWINCH, _on_terminal_resize)
+        return canvas, canvas2, math.inf
+
+    header, keys, resizes, ticks = read_log(REPLAY_PATH)
+    rows, columns = canvas.getmaxyx()
+    sizes = [(header.rows, header.columns), *resizes.values()]
+    session_rows, session_columns = max(size[0] for size in sizes), max(size[1] for size in sizes)
+    if rows < session_rows or columns < session_columns:
+        raise ValueError(f'Terminal {rows}x{columns} is too small to replay the session '
+                         f'of {session_rows}x{session_columns}.')
+
+    # the game is played on the window of the recorded size
+    canvas = canvas.derwin(header.rows, header.columns, 0, 0)
+    canvas, canvas2 = setup(canvas, header.seed, header.start_year, profiler, use_asyncio=use_asyncio,
+                            workers=SIMULATION_WORKERS, replay_keys=keys, replay_resizes=resizes, quality_name=QUALITY)
+    return canvas, canvas2, ticks
+
+
+def render(canvas, canvas2, profiler=None, started_at=None, simulated_at=None, overlay=True):
+    """Show the frame, simulated from started_at till simulated_at.
+    With overlay=False the profiler line is not drawn, so the screen does not depend on timings.
+    """
+
+    if profiler and overlay:
+        profiler.draw_overlay(overlay_layer)
+
+    composed_from = time.perf_counter()
+    compositor.compose()
+    if profiler:
+        profiler.add_part('compose', time.perf_counter() - composed_from)
     canvas.refresh()
+    canvas2.refresh()
 
-    # second canvas (subwindow) for the writings about year
-    canvas2 = canvas.derwin(1, 1)
-    canvas2.nodelay(True)
+    if profiler:
+        profiler.frame_done(simulated_at - started_at, time.perf_counter() - simulated_at, compositor, scheduler,
+                            pacer)
 
 
-    # read frames for the ship
-    frames = []
-    with open("animations/rocket_frame_1.txt", "r") as f:
-          frames.append(f.read())
-    with open("animations/rocket_frame_2.txt", "r") as f:
-          frames.append(f.read())    
+def play(canvas, profiler=None):
+    """Run the game, driving the coroutines by the tick scheduler."""
 
+    global pacer
 
-    # canvas sizes
-    max_row, max_column = canvas.getmaxyx()
-    middle_row = round(max_row/2)
-    middle_column = round(max_column/2)    
-    
-    # start for the sky
-    for _ in range(STARS_DENSITY):
-          row = random.randint(1, max_row-1)
-          column = random.randint(1, max_column-1)
-          star_symbol = random.choice(STARS_SYMBOLS)
-          coroutines.append(blink(canvas, row, column,symbol=star_symbol))
+    canvas, canvas2, session_ticks = start_session(canvas, profiler)
 
-    # spaceship
-    coroutines.append(animate_spaceship(canvas, middle_row, middle_column, frames))    
+    pacer = FramePacer(TIC_TIMEOUT, CATCH_UP_POLICY, MAX_CATCH_UP_TICKS)
+    # the first frame starts now, its work is subtracted from the pause as well
+    pacer.reset()
+    ticks = 1
+    while scheduler.tick_number < session_ticks:
+        started_at = time.perf_counter()
+        for _ in range(min(ticks, session_ticks - scheduler.tick_number)):
+            run_tick()
+        present(canvas, canvas2, profiler, started_at, time.perf_counter())
+        ticks = pacer.wait()
 
-    # add random garbage
-    coroutines.append(run_asteroid_field(canvas, max_column))
 
-    # year increment
-    coroutines.append(increment_year(canvas2))
+async def play_async(canvas, profiler=None):
+    """Run the game on the asyncio event loop, game coroutines are asyncio tasks."""
 
-    # eventloop
-    while True:
-        for obs_id in obstacles_to_stop:
-            try:
-                obstacles_coroutines[obs_id].throw(asyncio.CancelledError())
-            except StopIteration:
-                coroutines.remove(obstacles_coroutines[obs_id]) 
-        
-        for coroutine in coroutines:
-            try:
-                coroutine.send(None)
-            except StopIteration:
-                coroutines.remove(coroutine)
-        
-        canvas.border()
-        canvas.refresh()
-        canvas2.refresh()
-        time.sleep(TIC_TIMEOUT)
+    global pacer
+
+    canvas, canvas2, session_ticks = start_session(canvas, profiler, use_asyncio=True)
+
+    # keys are read as soon as they come, not only at the tick boundaries
+    input_fd = sys.stdin.fileno()
+    loop = asyncio.get_running_loop()
+    if not REPLAY_PATH:
+        loop.add_reader(input_fd, lambda: input_queue.poll(scheduler.tick_number))
+
+    pacer = FramePacer(TIC_TIMEOUT, CATCH_UP_POLICY, MAX_CATCH_UP_TICKS)
+    pacer.reset()
+    ticks = 1
+    try:
+        while scheduler.tick_number < session_ticks:
+            started_at = time.perf_counter()
+            for _ in range(min(ticks, session_ticks - scheduler.tick_number)):
+                await run_tick_async()
+            present(canvas, canvas2, profiler, started_at, time.perf_counter())
+            ticks = await pacer.wait_async()
+    finally:
+        loop.remove_reader(input_fd)
+        scheduler.close()
+
+
+def draw(canvas):
+    """Main draw functions"""
+
+    # canvas settings
+    canvas.border()
+    if OUTPUT == 'curses':
+        curses.curs_set(False)
+    canvas.nodelay(True)
+    canvas.refresh()
+
+    profiler = TickProfiler() if PROFILE_PATH else None
+    try:
+        if USE_ASYNCIO:
+            asyncio.run(play_async(canvas, profiler))
+        else:
+            play(canvas, profiler)
+    finally:
+        teardown()
+        if profiler:
+            profiler.dump(PROFILE_PATH)
 
 
 if __name__ == '__main__':
     
-    curses.update_lines_cols()
-    curses.wrapper(draw)
\ No newline at end of file
+    if OUTPUT == 'ansi':
+        ansi_terminal.wrapper(draw)
+    else:
+        curses.update_lines_cols()
+        curses.wrapper(draw)
@@ -0,0 +1,105 @@
+import curses
+import hashlib
+
+
+class MemoryCanvas:
+    """In-memory window with the part of curses window API the game uses.
+
+    Lets the game run without a terminal. Keys pressed are scripted:
+    `keys` maps tick number to the list of key codes getch returns during
+    that tick. The game loop calls next_tick() after every tick, so keys do
+    not depend on how often the screen is refreshed.
+    """
+
+    def __init__(self, rows=24, columns=80, keys=None):
+        self.rows = rows
+        self.columns = columns
+        self.keys = keys or {}
+        self.tick = 0
+        self.frame = 0
+        self.calls = 0
+        self.beeps = 0
+
+        self._symbols = [[' '] * columns for _ in range(rows)]
+        self._attrs = [[0] * columns for _ in range(rows)]
+        self._pending_keys = list(self.keys.get(0, ()))
+
+    def getmaxyx(self):
+        return self.rows, self.columns
+
+    def resize(self, rows, columns):
+        """Change the size as the terminal window would, content is kept where it fits."""
+
+        self._symbols = [line[:columns] + [' '] * (columns - len(line)) for line in self._symbols[:rows]]
+        self._symbols.extend([' '] * columns for _ in range(rows - len(self._symbols)))
+        self._attrs = [line[:columns] + [0] * (columns - len(line)) for line in self._attrs[:rows]]
+        self._attrs.extend([0] * columns for _ in range(rows - len(self._attrs)))
+        self.rows, self.columns = rows, columns
+
+    def clear(self):
+        self.calls += 1
+        self._symbols = [[' '] * self.columns for _ in range(self.rows)]
+        self._attrs = [[0] * self.columns for _ in range(self.rows)]
+
+    def addstr(self, row, column, text, attr=0):
+        self.calls += 1
+        if not (0 <= row < self.rows and 0 <= column < self.columns):
+            raise curses.error('addstr() returned ERR')
+
+        text = str(text)
+        end = min(column + len(text), self.columns)
+        self._symbols[row][column:end] = text[:end - column]
+        self._attrs[row][column:end] = [attr] * (end - column)
+
+        # as curses does, text is written, but the cursor can not go after the last cell
+        if row == self.rows - 1 and column + len(text) >= self.columns:
+            raise curses.error('addstr() returned ERR')
+
+    addch = addstr
+
+    def border(self):
+        self.calls += 1
+        last_row, last_column = self.rows - 1, self.columns - 1
+        for row in (0, last_row):
+            self._symbols[row][:] = '-' * self.columns
+        for row in range(self.rows):
+            self._symbols[row][0] = self._symbols[row][last_column] = '|'
+        for row, column in ((0, 0), (0, last_column), (last_row, 0), (last_row, last_column)):
+            self._symbols[row][column] = '+'
+
+    def getch(self):
+        if self._pending_keys:
+            return self._pending_keys.pop(0)
+        return -1
+
+    def next_tick(self):
+        """Keys of the next tick come in place of the ones not read."""
+
+        self.tick += 1
+        self._pending_keys = list(self.keys.get(self.tick, ()))
+
+    def refresh(self):
+        self.frame += 1
+
+    def beep(self):
+        self.beeps += 1
+
+    def nodelay(self, flag):
+        pass
+
+    def keypad(self, flag):
+        pass
+
+    def lines(self):
+        """Return the screen as list of strings."""
+
+        return [''.join(symbols) for symbols in self._symbols]
+
+    def digest(self):
+        """Return hash of the screen symbols and attributes."""
+
+        state = hashlib.sha1()
+        for symbols, attrs in zip(self._symbols, self._attrs):
+            state.update(''.join(symbols).encode())
+            state.update(repr(attrs).encode())
+        return state.hexdigest()
@@ -1,46 +1,75 @@
 from dataclasses import dataclass
 
+from sprite import box_mask, masks_overlap
 
-def _is_point_inside(corner_row, corner_column, size_rows, size_columns, point_row, point_row_column):
-    rows_flag = corner_row <= point_row < corner_row + size_rows
-    columns_flag = corner_column <= point_row_column < corner_column + size_columns
 
-    return rows_flag and columns_flag
-
-
-@dataclass 
+@dataclass
 class Obstacle:
+    __slots__ = ('row', 'column', 'frame_row', 'frame_column', 'mask')
+
     row: float
     column: float
     frame_row: float
     frame_column: float
+    # shape of the obstacle (Sprite.mask), None for the solid box
+    mask: tuple
 
     def coordinates(self):
         return (self.row, self.column)
-    
+
     def size(self):
         return (self.frame_row, self.frame_column)
 
-    def has_collision(self, obj_corner, obj_size=(1, 1)):
-        '''Determine if collision has occured. Return True of False.'''
+    def has_collision(self, obj_corner, obj_size=(1, 1), obj_mask=None):
+        '''Determine if collision has occured. Return True of False.
+
+        Collision is a corner of one box inside the other one. Boxes are half-open:
+        the corner is inside if corner <= point < corner + size.
+        Nothing is allocated, check is done in place.
+        With obj_mask the shapes are tested, see has_shape_collision.
+        '''
+
+        if obj_mask is not None:
+            return self.has_shape_collision(obj_corner, obj_size, obj_mask)
+
+        row, column = self.row, self.column
+        size_rows, size_columns = self.frame_row, self.frame_column
+        obj_row, obj_column = obj_corner
+        obj_size_rows, obj_size_columns = obj_size
+
+        # corner of the object inside the obstacle
+        if row <= obj_row < row + size_rows and column <= obj_column < column + size_columns:
+            return True
+
+        # opposite corner of the object inside the obstacle
+        opposite_row = obj_row + obj_size_rows - 1
+        opposite_column = obj_column + obj_size_columns - 1
+        if row <= opposite_row < row + size_rows and column <= opposite_column < column + size_columns:
+            return True
+
+        # corner of the obstacle inside the object
+        if obj_row <= row < obj_row + obj_size_rows and obj_column <= column < obj_column + obj_size_columns:
+            return True
 
-        obstacle_corner = self.coordinates()
-        obstacle_size = self.size()
+        # opposite corner of the obstacle inside the object
+        opposite_row = row + size_rows - 1
+        opposite_column = column + size_columns - 1
+        return (obj_row <= opposite_row < obj_row + obj_size_rows
+                and obj_column <= opposite_column < obj_column + obj_size_columns)
 
-        opposite_obstacle_corner = (
-            obstacle_corner[0] + obstacle_size[0] - 1,
-            obstacle_corner[1] + obstacle_size[1] - 1,
-        )
+    def has_shape_collision(self, obj_corner, obj_size, obj_mask):
+        '''Determine if the drawn symbols of the obstacle and the object overlap.
 
-        opposite_obj_corner = (
-            obj_corner[0] + obj_size[0] - 1,
-            obj_corner[1] + obj_size[1] - 1,
-        )
+        Positions are rounded to the cells as draw_frame does. Boxes of the cells
+        are compared first, masks are ANDed only if the boxes intersect.
+        '''
 
-        return any([
-            _is_point_inside(*obstacle_corner, *obstacle_size, *obj_corner),
-            _is_point_inside(*obstacle_corner, *obstacle_size, *opposite_obj_corner),
+        row, column = round(self.row), round(self.column)
+        obj_row, obj_column = round(obj_corner[0]), round(obj_corner[1])
+        obj_size_rows, obj_size_columns = obj_size
+        if not (row < obj_row + obj_size_rows and obj_row < row + self.frame_row
+                and column < obj_column + obj_size_columns and obj_column < column + self.frame_column):
+            return False
 
-            _is_point_inside(*obj_corner, *obj_size, *obstacle_corner),
-            _is_point_inside(*obj_corner, *obj_size, *opposite_obstacle_corner),
-        ])
\ No newline at end of file
+        mask = self.mask if self.mask is not None else box_mask(self.frame_row, self.frame_column)
+        return masks_overlap(mask, row, column, obj_mask, obj_row, obj_column)
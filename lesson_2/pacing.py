@@ -0,0 +1,86 @@
+import asyncio
+import collections
+import time
+
+
+CATCH_UP_POLICIES = ('merge', 'drop')
+
+
+class FramePacer:
+    """Keep frames on absolute deadlines taken from time.monotonic().
+
+    The time spent on the frame work is subtracted from the pause, so the tick
+    period does not drift with the load. When the loop falls behind, the
+    catch-up policy decides what to do with the missed ticks:
+       'merge' — simulate the missed ticks in the next frame (up to max_catch_up),
+                 game speed stays the same, only the rendering is skipped
+       'drop'  — skip the missed ticks, game slows down under the load
+    """
+
+    def __init__(self, period, catch_up='merge', max_catch_up=5, history=100,
+                 clock=time.monotonic, sleep=time.sleep):
+
+        if catch_up not in CATCH_UP_POLICIES:
+            raise ValueError(f'Wrong catch_up value {catch_up}. Expects one of {CATCH_UP_POLICIES}.')
+
+        self.period = period
+        self.catch_up = catch_up
+        self.max_catch_up = max_catch_up
+        self.clock = clock
+        self.sleep = sleep
+
+        # how late the last frame was, in seconds
+        self.lateness = 0.0
+        self.max_lateness = 0.0
+        self.late_frames = collections.deque(maxlen=history)
+        self.dropped_ticks = 0
+
+        self._deadline = None
+
+    def reset(self):
+        """Take the current moment as the start of the frame."""
+
+        self._deadline = self.clock()
+
+    def wait(self):
+        """Sleep until the next frame deadline. Return number of ticks to simulate."""
+
+        delay = self._next_delay()
+        if delay > 0:
+            self.sleep(delay)
+        return self._catch_up()
+
+    async def wait_async(self):
+        """Same as wait(), but sleeps with asyncio, so the event loop goes on."""
+
+        delay = self._next_delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self._catch_up()
+
+    def _next_delay(self):
+        if self._deadline is None:
+            self.reset()
+
+        self._deadline += self.period
+        return self._deadline - self.clock()
+
+    def _catch_up(self):
+        self.lateness = max(0.0, self.clock() - self._deadline)
+        self.max_lateness = max(self.max_lateness, self.lateness)
+        self.late_frames.append(self.lateness)
+
+        missed = int(self.lateness // self.period)
+        if not missed:
+            return 1
+
+        # deadlines already passed are not waited for
+        self._deadline += missed * self.period
+
+        if self.catch_up == 'merge':
+            merged = min(missed, self.max_catch_up)
+            self.dropped_ticks += missed - merged
+            return 1 + merged
+
+        self.dropped_ticks += missed
+        return 1
@@ -1,5 +1,16 @@
+import array
+import itertools
 import math
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# below this number of bodies plain Python loop is faster than NumPy
+NUMPY_MIN_BODIES = 64
+
 def _limit(value, min_value, max_value):
     """Limit value by min_value and max_value."""
 
@@ -71,4 +82,105 @@ def update_speed(row_speed, column_speed, rows_direction, columns_direction, row
     if columns_direction != 0:
         column_speed = _apply_acceleration(column_speed, column_speed_limit, columns_direction > 0)
 
-    return row_speed, column_speed
\ No newline at end of file
+    return row_speed, column_speed
+
+
+class Bodies:
+    """Positions and speeds of moving bodies (garbage, shots) in arrays.
+
+    All the bodies are moved at once by step_arrays() in the physics step of
+    Simulation, one step per game tick.
+    Arrays are dense: removed body is replaced by the last one.
+    """
+
+    def __init__(self, use_numpy=True):
+        self.use_numpy = use_numpy and np is not None
+
+        self.rows = array.array('d')
+        self.columns = array.array('d')
+        self.row_speeds = array.array('d')
+        self.column_speeds = array.array('d')
+
+        self._ids = []
+        self._indexes = {}
+        self._counter = itertools.count()
+        # changes on every change but load_positions(), to know if a snapshot is still valid
+        self.version = 0
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, body):
+        return body in self._indexes
+
+    def add(self, row, column, row_speed=0, column_speed=0):
+        """Add body, return its id."""
+
+        body = next(self._counter)
+        self.version += 1
+        self._indexes[body] = len(self._ids)
+        self._ids.append(body)
+        self.rows.append(row)
+        self.columns.append(column)
+        self.row_speeds.append(row_speed)
+        self.column_speeds.append(column_speed)
+        return body
+
+    def remove(self, body):
+        index = self._indexes.pop(body)
+        self.version += 1
+        last = len(self._ids) - 1
+        if index != last:
+            moved_body = self._ids[last]
+            self._ids[index] = moved_body
+            self._indexes[moved_body] = index
+            for values in (self.rows, self.columns, self.row_speeds, self.column_speeds):
+                values[index] = values[last]
+
+        self._ids.pop()
+        for values in (self.rows, self.columns, self.row_speeds, self.column_speeds):
+            values.pop()
+
+    def index(self, body):
+        """Index of the body in the arrays, valid till the next remove()."""
+
+        return self._indexes[body]
+
+    def position(self, body):
+        index = self._indexes[body]
+        return self.rows[index], self.columns[index]
+
+    def place(self, body, row, column):
+        index = self._indexes[body]
+        self.version += 1
+        self.rows[index] = row
+        self.columns[index] = column
+
+    def snapshot(self):
+        """Copy of positions and speeds, (rows, columns, row_speeds, column_speeds)."""
+
+        return (array.array('d', self.rows), array.array('d', self.columns),
+                array.array('d', self.row_speeds), array.array('d', self.column_speeds))
+
+    def load_positions(self, rows, columns):
+        """Set positions of all the bodies at once, arrays are in the order of snapshot()."""
+
+        self.rows[:] = rows
+        self.columns[:] = columns
+
+
+def step_arrays(rows, columns, row_speeds, column_speeds, dt=1.0, use_numpy=True):
+    """Move positions in the arrays by speeds in place."""
+
+    if use_numpy and np is not None and len(rows) >= NUMPY_MIN_BODIES:
+        # views on the arrays memory, arrays are changed in place
+        rows_view = np.frombuffer(rows, dtype=float)
+        rows_view += np.frombuffer(row_speeds, dtype=float) * dt
+        columns_view = np.frombuffer(columns, dtype=float)
+        columns_view += np.frombuffer(column_speeds, dtype=float) * dt
+        del rows_view, columns_view
+        return
+
+    for index in range(len(rows)):
+        rows[index] += row_speeds[index] * dt
+        columns[index] += column_speeds[index] * dt
@@ -0,0 +1,67 @@
+OVERFLOW_POLICIES = ('drop', 'grow', 'error')
+
+
+class PoolOverflow(Exception):
+    pass
+
+
+class Pool:
+    """Objects made once and used again and again.
+
+    `capacity` objects are made by factory() in advance. acquire() takes a free
+    one, release() gives it back. When all the objects are taken, the overflow
+    policy decides what acquire() does:
+       'drop'  — return None, the caller goes without the object
+       'grow'  — make one more object, it stays in the pool after release
+       'error' — raise PoolOverflow
+    Statistics (stats()) show the peak use, to size the pool for the peak load.
+    """
+
+    def __init__(self, factory, capacity, overflow='drop'):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f'Wrong overflow value {overflow}. Expects one of {OVERFLOW_POLICIES}.')
+
+        self.factory = factory
+        self.capacity = capacity
+        self.overflow = overflow
+        self._free = [factory() for _ in range(capacity)]
+        self._size = capacity
+
+        self.in_use = 0
+        self.peak = 0
+        self.acquired = 0
+        self.overflows = 0
+
+    def __len__(self):
+        return self._size
+
+    def acquire(self):
+        if self._free:
+            item = self._free.pop()
+        else:
+            self.overflows += 1
+            if self.overflow == 'drop':
+                return None
+            if self.overflow == 'error':
+                raise PoolOverflow(f'All {self._size} objects of the pool are in use.')
+            item = self.factory()
+            self._size += 1
+
+        self.in_use += 1
+        self.acquired += 1
+        self.peak = max(self.peak, self.in_use)
+        return item
+
+    def release(self, item):
+        self.in_use -= 1
+        self._free.append(item)
+
+    def stats(self):
+        return {
+            'capacity': self.capacity,
+            'size': self._size,
+            'in_use': self.in_use,
+            'peak': self.peak,
+            'acquired': self.acquired,
+            'overflows': self.overflows,
+        }
@@ -0,0 +1,135 @@
+import collections
+import time
+
+from scheduler import Scheduler
+
+
+class TickProfiler:
+    """Collect time of coroutine steps grouped by coroutine function,
+    time of simulation and refresh, number of cells written and how late
+    the frames were.
+
+    Work of the tick done out of the coroutines is timed as parts of its own:
+    'physics' (step of the bodies and collisions) and 'layers' (clearing of
+    the transient layers) of the simulation, 'compose' of the refresh.
+
+    The profile is dumped in the folded stacks format, which flame graph
+    tools read (flamegraph.pl, speedscope, inferno): `game;simulation;blink 1234`,
+    values are microseconds.
+    """
+
+    def __init__(self):
+        self.frames = 0
+        self.simulation_time = 0.0
+        self.refresh_time = 0.0
+        self.steps_time = collections.Counter()
+        self.steps_count = collections.Counter()
+        self.parts_time = collections.Counter()
+
+        self.last_frame = None
+        self._frame_steps_time = collections.Counter()
+        self._frame_parts_time = collections.Counter()
+        self._cells_written = 0
+        self._cells_composed = 0
+
+    def add_step(self, kind, duration):
+        self.steps_time[kind] += duration
+        self.steps_count[kind] += 1
+        self._frame_steps_time[kind] += duration
+
+    def add_part(self, part, duration):
+        """Add time of the part of the tick: 'physics', 'layers' or 'compose'."""
+
+        self.parts_time[part] += duration
+        self._frame_parts_time[part] += duration
+
+    def frame_done(self, simulation_time, refresh_time, compositor, scheduler, pacer=None):
+        """Finish the frame and remember its stats for the overlay.
+
+        Cells drawn on the layers of the compositor are the cells written,
+        cells put together from the layers are counted apart.
+        pacer is the FramePacer of the loop, None if frames are not paced.
+        """
+
+        self.frames += 1
+        self.simulation_time += simulation_time
+        self.refresh_time += refresh_time
+
+        live = collections.Counter(coroutine.__qualname__ for coroutine in scheduler.coroutines())
+        self.last_frame = {
+            'simulation': simulation_time,
+            'refresh': refresh_time,
+            'steps': self._frame_steps_time,
+            'parts': self._frame_parts_time,
+            'live': live,
+            'cells': compositor.written - self._cells_written,
+            'composed': compositor.composed - self._cells_composed,
+            'pacer': pacer,
+        }
+        self._cells_written = compositor.written
+        self._cells_composed = compositor.composed
+        self._frame_steps_time = collections.Counter()
+        self._frame_parts_time = collections.Counter()
+
+    def overlay(self, top=3):
+        """Return status line with stats of the last frame."""
+
+        frame = self.last_frame
+        if frame is None:
+            return ''
+
+        times = frame['parts']
+        parts = [f'sim {frame["simulation"] * 1000:.1f}ms refresh {frame["refresh"] * 1000:.1f}ms']
+        pacer = frame['pacer']
+        if pacer is not None:
+            average = sum(pacer.late_frames) / len(pacer.late_frames) if pacer.late_frames else 0.0
+            parts.append(f'late {pacer.lateness * 1000:.1f}ms avg {average * 1000:.1f}ms '
+                         f'max {pacer.max_lateness * 1000:.1f}ms dropped {pacer.dropped_ticks}')
+        parts.append(f'physics {times["physics"] * 1000:.1f}ms layers {times["layers"] * 1000:.1f}ms '
+                     f'compose {times["compose"] * 1000:.1f}ms cells {frame["cells"]} composed {frame["composed"]}')
+        for kind, duration in frame['steps'].most_common(top):
+            parts.append(f'{kind} x{frame["live"][kind]} {duration * 1000:.1f}ms')
+        return ' | '.join(parts)
+
+    def draw_overlay(self, canvas):
+        rows, columns = canvas.getmaxyx()
+        canvas.addstr(rows - 2, 1, self.overlay().ljust(columns - 2)[:columns - 2])
+
+    def folded(self):
+        """Return profile as lines of folded stacks."""
+
+        def microseconds(seconds):
+            return round(seconds * 1_000_000)
+
+        lines = []
+        parts = self.parts_time
+        simulation_parts = parts['physics'] + parts['layers']
+        steps_total = sum(self.steps_time.values())
+        for kind, duration in sorted(self.steps_time.items()):
+            lines.append(f'game;simulation;{kind} {microseconds(duration)}')
+        lines.append(f'game;simulation;physics {microseconds(parts["physics"])}')
+        lines.append(f'game;simulation;layers {microseconds(parts["layers"])}')
+        lines.append(f'game;simulation;scheduler '
+                     f'{microseconds(max(0.0, self.simulation_time - steps_total - simulation_parts))}')
+        lines.append(f'game;refresh;compose {microseconds(parts["compose"])}')
+        lines.append(f'game;refresh {microseconds(max(0.0, self.refresh_time - parts["compose"]))}')
+        return lines
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            f.write('\n'.join(self.folded()) + '\n')
+
+
+class ProfiledScheduler(Scheduler):
+    """Scheduler timing every coroutine step."""
+
+    def __init__(self, profiler):
+        super().__init__()
+        self.profiler = profiler
+
+    def _step(self, coroutine, method, value):
+        started_at = time.perf_counter()
+        try:
+            super()._step(coroutine, method, value)
+        finally:
+            self.profiler.add_step(coroutine.__qualname__, time.perf_counter() - started_at)
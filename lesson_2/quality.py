@@ -0,0 +1,83 @@
+import collections
+
+
+# stars — part of the stars shown, explosion_step — every which explosion frame is drawn,
+# trail — draw muzzle flash of the shots, refresh_every — refresh the screen every N frames
+Quality = collections.namedtuple('Quality', 'name stars explosion_step trail refresh_every')
+
+LEVELS = (
+    Quality('high', 1.0, 1, True, 1),
+    Quality('medium', 0.5, 1, True, 1),
+    Quality('low', 0.25, 2, False, 1),
+    Quality('minimal', 0.1, 2, False, 2),
+)
+
+# cells sent to the terminal per frame that are considered full load
+CELLS_BUDGET = 2000
+
+
+def level_by_name(name, levels=LEVELS):
+    for level, quality in enumerate(levels):
+        if quality.name == name:
+            return level
+    raise ValueError(f'Wrong quality {name}. Expects one of {[quality.name for quality in levels]}.')
+
+
+class QualityController:
+    """Lower the quality when frames are too heavy, raise it back when they are light again.
+
+    Load of the frame is the largest of its work time to the frame period and
+    cells sent to the terminal to cells_budget, smoothed over the frames.
+    Quality goes down one level when the load stays above `high` for
+    degrade_frames frames in a row, and goes up one level only after the
+    load stays below `low` for restore_frames frames. The gap between
+    the thresholds and the longer wait to restore keep the level from flapping.
+    """
+
+    def __init__(self, period, cells_budget=CELLS_BUDGET, levels=LEVELS, high=0.8, low=0.4,
+                 degrade_frames=10, restore_frames=50, smoothing=0.2):
+        self.period = period
+        self.cells_budget = cells_budget
+        self.levels = levels
+        self.high = high
+        self.low = low
+        self.degrade_frames = degrade_frames
+        self.restore_frames = restore_frames
+        self.smoothing = smoothing
+
+        self.level = 0
+        self.load = 0.0
+        self.changes = 0
+        self._heavy_frames = 0
+        self._light_frames = 0
+
+    @property
+    def quality(self):
+        return self.levels[self.level]
+
+    def update(self, work_time, cells):
+        """Take measurements of the frame. Return True if the level has changed."""
+
+        load = max(work_time / self.period, cells / self.cells_budget)
+        self.load += (load - self.load) * self.smoothing
+
+        if self.load > self.high:
+            self._heavy_frames += 1
+            self._light_frames = 0
+        elif self.load < self.low:
+            self._light_frames += 1
+            self._heavy_frames = 0
+        else:
+            self._heavy_frames = self._light_frames = 0
+
+        if self._heavy_frames >= self.degrade_frames and self.level < len(self.levels) - 1:
+            return self._set_level(self.level + 1)
+        if self._light_frames >= self.restore_frames and self.level > 0:
+            return self._set_level(self.level - 1)
+        return False
+
+    def _set_level(self, level):
+        self.level = level
+        self.changes += 1
+        self._heavy_frames = self._light_frames = 0
+        return True
@@ -0,0 +1,223 @@
+import asyncio
+import functools
+import heapq
+import itertools
+import time
+import types
+
+
+@types.coroutine
+def sleep(tics=1):
+    """Suspend the coroutine for the given number of ticks.
+
+    The number of ticks is yielded to the scheduler, so a sleeping coroutine
+    is not resumed until its wake-up tick comes.
+    """
+
+    if tics > 0:
+        yield tics
+
+
+class Scheduler:
+    """Run coroutines by ticks. Each tick resumes only the coroutines that are due.
+
+    Sleeping coroutines are kept in a heap keyed by wake-up tick. A coroutine
+    may yield a number of ticks to sleep (see `sleep`) or None, which means
+    one tick (that is what `asyncio.sleep(0)` yields).
+    """
+
+    def __init__(self):
+        self.tick_number = 0
+        self._queue = []
+        self._entries = {}
+        self._order = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, coroutine):
+        return coroutine in self._entries
+
+    def coroutines(self):
+        """Return live coroutines."""
+
+        return list(self._entries)
+
+    def spawn(self, coroutine, delay=0):
+        """Add coroutine to the scheduler. It starts after `delay` ticks."""
+
+        self._schedule(coroutine, self.tick_number + delay)
+        return coroutine
+
+    def cancel(self, coroutine):
+        """Throw CancelledError into coroutine. Return False if it is not scheduled."""
+
+        entry = self._entries.pop(coroutine, None)
+        if entry is None:
+            return False
+
+        # heap entries are removed lazily
+        entry[-1] = None
+        self._step(coroutine, coroutine.throw, asyncio.CancelledError())
+        return True
+
+    def tick(self):
+        """Resume all coroutines due on the current tick and go to the next one."""
+
+        queue = self._queue
+        while queue and queue[0][0] <= self.tick_number:
+            coroutine = heapq.heappop(queue)[-1]
+            if coroutine is None:
+                continue
+            del self._entries[coroutine]
+            self._step(coroutine, coroutine.send, None)
+
+        self.tick_number += 1
+
+    def _schedule(self, coroutine, wake_tick):
+        entry = [wake_tick, next(self._order), coroutine]
+        self._entries[coroutine] = entry
+        heapq.heappush(self._queue, entry)
+
+    def _step(self, coroutine, method, value):
+        try:
+            tics = method(value)
+        except (StopIteration, asyncio.CancelledError):
+            return
+
+        self._schedule(coroutine, self.tick_number + (tics or 1))
+
+
+class AsyncioScheduler:
+    """Run coroutines by ticks as asyncio tasks. Must be used inside the running event loop.
+
+    Every game coroutine is driven by its own Task. The ticks the coroutine
+    yields (see `sleep`) are waited for on futures resolved by tick(), so
+    cancel() is task.cancel() and CancelledError comes to the coroutine at its
+    `await sleep()`. Coroutines may also await asyncio futures (I/O), such a
+    coroutine does not hold the tick while it waits.
+    """
+
+    def __init__(self, profiler=None):
+        self.tick_number = 0
+        self.profiler = profiler
+        self._queue = []
+        self._order = itertools.count()
+        self._tasks = {}
+        self._waiting = {}
+        self._errors = []
+        # number of tasks to run before the tick is finished
+        self._running = 0
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __contains__(self, coroutine):
+        return coroutine in self._tasks
+
+    def coroutines(self):
+        return list(self._tasks)
+
+    def spawn(self, coroutine, delay=0):
+        self._running += 1
+        task = asyncio.get_running_loop().create_task(self._drive(coroutine, delay))
+        task.add_done_callback(functools.partial(self._task_done, coroutine))
+        self._tasks[coroutine] = task
+        return coroutine
+
+    def cancel(self, coroutine):
+        task = self._tasks.get(coroutine)
+        if task is None or task.done():
+            return False
+
+        if self._waiting.pop(coroutine, None) is not None:
+            self._running += 1
+        task.cancel()
+        return True
+
+    def close(self):
+        """Close all the coroutines and cancel their tasks."""
+
+        for coroutine, task in list(self._tasks.items()):
+            coroutine.close()
+            task.cancel()
+
+    async def tick(self):
+        """Wake up coroutines due on the current tick, wait for all of them to run and go to the next tick."""
+
+        queue = self._queue
+        while queue and queue[0][0] <= self.tick_number:
+            future, coroutine = heapq.heappop(queue)[2:]
+            if future.done():
+                continue
+            del self._waiting[coroutine]
+            self._running += 1
+            future.set_result(None)
+
+        while self._running > 0:
+            await asyncio.sleep(0)
+
+        if self._errors:
+            raise self._errors.pop(0)
+
+        self.tick_number += 1
+
+    async def _drive(self, coroutine, delay):
+        method, value = coroutine.send, None
+        try:
+            if delay:
+                await self._wait(coroutine, delay)
+
+            while True:
+                try:
+                    tics = self._step(coroutine, method, value)
+                except (StopIteration, asyncio.CancelledError):
+                    return
+                method, value = coroutine.send, None
+
+                try:
+                    if isinstance(tics, asyncio.Future):
+                        value = await self._wait_io(tics)
+                    else:
+                        await self._wait(coroutine, tics or 1)
+                except asyncio.CancelledError as error:
+                    method, value = coroutine.throw, error
+        finally:
+            self._running -= 1
+            del self._tasks[coroutine]
+
+    def _step(self, coroutine, method, value):
+        if self.profiler is None:
+            return method(value)
+
+        started_at = time.perf_counter()
+        try:
+            return method(value)
+        finally:
+            self.profiler.add_step(coroutine.__qualname__, time.perf_counter() - started_at)
+
+    async def _wait(self, coroutine, tics):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (self.tick_number + tics, next(self._order), future, coroutine))
+        self._waiting[coroutine] = future
+        self._running -= 1
+        await future
+
+    async def _wait_io(self, future):
+        # coroutine yielded the future, as `await future` does, so it is marked as blocking
+        future._asyncio_future_blocking = False
+        self._running -= 1
+        try:
+            return await future
+        finally:
+            self._running += 1
+
+    def _task_done(self, coroutine, task):
+        if coroutine in self._tasks:
+            # task was cancelled before it started
+            del self._tasks[coroutine]
+            self._running -= 1
+            coroutine.close()
+
+        if not task.cancelled() and task.exception() is not None:
+            self._errors.append(task.exception())
@@ -0,0 +1,181 @@
+import curses
+
+
+class BufferedCanvas:
+    """Double-buffered proxy for a curses window.
+
+    Drawing goes to the in-memory back buffer. On refresh the back buffer is
+    compared with the front buffer (what is already on the screen) and only the
+    changed cells are sent to curses. Contiguous changed cells with the same
+    attributes are sent with a single addstr call.
+
+    Everything else (getch, nodelay, border...) is passed to the window as is.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.rows, self.columns = canvas.getmaxyx()
+
+        self._symbols = [[' '] * self.columns for _ in range(self.rows)]
+        self._attrs = [[0] * self.columns for _ in range(self.rows)]
+        self._front_symbols = [[' '] * self.columns for _ in range(self.rows)]
+        self._front_attrs = [[0] * self.columns for _ in range(self.rows)]
+
+        # row -> [first column, last column + 1] touched since the last flush
+        self._dirty = {}
+
+        # statistics: cells written to the buffer, calls and cells sent to curses
+        self.written = 0
+        self.calls = 0
+        self.cells = 0
+
+    def __getattr__(self, name):
+        return getattr(self.canvas, name)
+
+    def getmaxyx(self):
+        return self.rows, self.columns
+
+    def resize(self):
+        """Follow the new size of the window. Return True if the size has changed.
+
+        Buffer content is kept where it fits. The window is cleared and the
+        whole buffer goes to it on the next flush, so the redraw takes one frame.
+        """
+
+        rows, columns = self.canvas.getmaxyx()
+        if (rows, columns) == (self.rows, self.columns):
+            return False
+
+        self._symbols = fit_grid(self._symbols, rows, columns, ' ')
+        self._attrs = fit_grid(self._attrs, rows, columns, 0)
+        self._front_symbols = [[' '] * columns for _ in range(rows)]
+        self._front_attrs = [[0] * columns for _ in range(rows)]
+        self._dirty = {row: [0, columns] for row in range(rows)}
+        self.rows, self.columns = rows, columns
+
+        self.canvas.clear()
+        return True
+
+    def addstr(self, row, column, text, attr=0):
+        """Write text to the back buffer. Text out of the canvas is clipped."""
+
+        if not 0 <= row < self.rows:
+            return
+
+        if column < 0:
+            text = text[-column:]
+            column = 0
+        text = text[:self.columns - column]
+        if not text:
+            return
+
+        end = column + len(text)
+        self._symbols[row][column:end] = text
+        self._attrs[row][column:end] = [attr] * len(text)
+        self.written += len(text)
+
+        span = self._dirty.get(row)
+        if span is None:
+            self._dirty[row] = [column, end]
+        else:
+            span[0] = min(span[0], column)
+            span[1] = max(span[1], end)
+
+    addch = addstr
+
+    def put(self, row, column, symbols, attrs):
+        """Write lists of symbols and attributes of the same length, they must fit in the canvas."""
+
+        end = column + len(symbols)
+        self._symbols[row][column:end] = symbols
+        self._attrs[row][column:end] = attrs
+        self.written += len(symbols)
+
+        span = self._dirty.get(row)
+        if span is None:
+            self._dirty[row] = [column, end]
+        else:
+            span[0] = min(span[0], column)
+            span[1] = max(span[1], end)
+
+    def derwin(self, begin_row, begin_column):
+        """Return subwindow drawing to the same buffer."""
+
+        return SubCanvas(self, begin_row, begin_column)
+
+    def beep(self):
+        beep = getattr(self.canvas, 'beep', curses.beep)
+        beep()
+
+    def border(self):
+        # border is drawn by curses over the buffer content, as it was before
+        self.flush()
+        self.canvas.border()
+
+    def refresh(self):
+        self.flush()
+        self.canvas.refresh()
+
+    def flush(self):
+        """Send the changed cells to curses."""
+
+        for row, (start, end) in self._dirty.items():
+            symbols, attrs = self._symbols[row], self._attrs[row]
+            front_symbols, front_attrs = self._front_symbols[row], self._front_attrs[row]
+
+            column = start
+            while column < end:
+                if symbols[column] == front_symbols[column] and attrs[column] == front_attrs[column]:
+                    column += 1
+                    continue
+
+                run_start = column
+                attr = attrs[column]
+                while column < end and attrs[column] == attr and (
+                        symbols[column] != front_symbols[column] or front_attrs[column] != attr):
+                    column += 1
+
+                front_symbols[run_start:column] = symbols[run_start:column]
+                front_attrs[run_start:column] = attrs[run_start:column]
+                self._emit(row, run_start, ''.join(symbols[run_start:column]), attr)
+
+        self._dirty.clear()
+
+    def _emit(self, row, column, text, attr):
+        self.calls += 1
+        self.cells += len(text)
+        try:
+            self.canvas.addstr(row, column, text, attr)
+        except curses.error:
+            # curses can not move the cursor after the bottom right corner
+            pass
+
+
+def fit_grid(grid, rows, columns, fill):
+    grid = [line[:columns] + [fill] * (columns - len(line)) for line in grid[:rows]]
+    grid.extend([fill] * columns for _ in range(rows - len(grid)))
+    return grid
+
+
+class SubCanvas:
+    """Part of BufferedCanvas (or of any canvas with rows and columns) with shifted coordinates, like curses derwin."""
+
+    def __init__(self, parent, begin_row, begin_column):
+        self.parent = parent
+        self.begin_row = begin_row
+        self.begin_column = begin_column
+
+    def __getattr__(self, name):
+        return getattr(self.parent, name)
+
+    def getmaxyx(self):
+        return self.parent.rows - self.begin_row, self.parent.columns - self.begin_column
+
+    def addstr(self, row, column, text, attr=0):
+        self.parent.addstr(self.begin_row + row, self.begin_column + column, text, attr)
+
+    addch = addstr
+
+    def refresh(self):
+        # the whole buffer is flushed by the parent canvas
+        pass
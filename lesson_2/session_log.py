@@ -0,0 +1,174 @@
+"""Binary log of a game session: everything needed to play it again.
+
+Log starts with the header (magic, version, seed, rows, columns, start year),
+then goes a record for every tick keys were consumed on or the terminal was
+resized on: varint ticks since the previous record, then
+   varint number of keys * 2, varint key codes — for the keys
+   varint 1, varint rows, varint columns — for the new size of the terminal.
+The last record, with no keys, has the number of ticks of the session.
+"""
+import collections
+import struct
+
+from input_events import KeyEvent
+
+
+MAGIC = b'AWRL'
+VERSION = 2
+HEADER = struct.Struct('<4sBqHHh')
+# kind of the record with the new size of the terminal, key records have even kinds
+RESIZE = 1
+# records are written to the file buffer, the buffer goes to disk every FLUSH_RECORDS records
+FLUSH_RECORDS = 256
+
+Header = collections.namedtuple('Header', 'seed rows columns start_year')
+
+
+def _write_varint(buffer, value):
+    if value < 0:
+        raise ValueError(f'Wrong value {value}. Expects non-negative integer.')
+    while value > 0x7f:
+        buffer.append(value & 0x7f | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data, position):
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+class Recorder:
+    """Append key codes consumed on every tick and terminal resizes to the log file."""
+
+    def __init__(self, path, seed, rows, columns, start_year):
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, seed, rows, columns, start_year))
+        self._file.flush()
+        self._buffer = bytearray()
+        self._last_tick = 0
+        self._records = 0
+
+    def record(self, tick, codes):
+        self._write(tick, len(codes) << 1, codes)
+
+    def record_resize(self, tick, rows, columns):
+        """Terminal has got the new size on the tick."""
+
+        self._write(tick, RESIZE, (rows, columns))
+
+    def _write(self, tick, kind, values):
+        buffer = self._buffer
+        _write_varint(buffer, tick - self._last_tick)
+        _write_varint(buffer, kind)
+        for value in values:
+            _write_varint(buffer, value)
+        self._last_tick = tick
+
+        self._file.write(buffer)
+        buffer.clear()
+
+        self._records += 1
+        if self._records % FLUSH_RECORDS == 0:
+            self._file.flush()
+
+    def close(self, ticks):
+        """Write number of ticks the session lasted and close the file."""
+
+        if self._file.closed:
+            return
+        self.record(max(ticks, self._last_tick + 1), ())
+        self._file.close()
+
+
+def read_log(path):
+    """Return (header, {tick: key codes}, {tick: (rows, columns)}, number of ticks in the session)."""
+
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    magic, version, *fields = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f'{path} is not a session log of version {VERSION}.')
+
+    keys = {}
+    resizes = {}
+    tick = kind = 0
+    position = HEADER.size
+    while position < len(data):
+        try:
+            record_tick, record_kind, values, position = _read_record(data, position, tick)
+        except IndexError:
+            # log cut short inside the record, the records before it are the session
+            break
+        tick, kind = record_tick, record_kind
+        if kind == RESIZE:
+            resizes[tick] = values
+        elif values:
+            keys.setdefault(tick, []).extend(values)
+
+    # log of a session that crashed ends with the last keys or resize, not with the number of ticks
+    ticks = tick + 1 if kind else tick
+    return Header(*fields), keys, resizes, ticks
+
+
+def _read_record(data, position, tick):
+    """Return (tick, kind, key codes or (rows, columns), position after the record)."""
+
+    delta, position = _read_varint(data, position)
+    kind, position = _read_varint(data, position)
+    values = []
+    for _ in range(2 if kind == RESIZE else kind >> 1):
+        value, position = _read_varint(data, position)
+        values.append(value)
+    return tick + delta, kind, tuple(values) if kind == RESIZE else values, position
+
+
+class ReplayInput:
+    """Input queue giving the keys from the log, on the same ticks they were consumed.
+
+    Terminal resizes of the log are done to the canvas on the ticks they were
+    taken on, as the terminal would do them. Resizes of the real terminal are
+    not followed, the replayed session keeps the recorded sizes.
+    """
+
+    def __init__(self, keys, resizes=None, canvas=None):
+        self.keys = keys
+        self.resizes = resizes or {}
+        self.canvas = canvas
+        self.events = collections.deque()
+        self.dropped = 0
+        self.tick = -1
+        self.resized = False
+
+    def __len__(self):
+        return len(self.events)
+
+    def poll(self, tick):
+        if tick <= self.tick:
+            return
+        self.tick = tick
+        for code in self.keys.get(tick, ()):
+            self.events.append(KeyEvent(code, None, tick))
+
+        size = self.resizes.get(tick)
+        if size is not None:
+            self.canvas.resize(*size)
+            self.resized = True
+
+    def consume(self):
+        events = list(self.events)
+        self.events.clear()
+        return events
+
+    def request_resize(self):
+        pass
+
+    def close(self):
+        pass
@@ -0,0 +1,201 @@
+import collections
+import concurrent.futures
+
+from physics import step_arrays
+from spatial import BoxGrid
+from sprite import box_mask, mask_covers
+
+
+POOL_KINDS = ('thread', 'process')
+
+Snapshot = collections.namedtuple('Snapshot', 'rows columns row_speeds column_speeds targets shots dt use_numpy')
+
+
+def simulate(snapshot):
+    """Step the bodies of the snapshot and test shots against targets.
+
+    Return (rows, columns, hits): new positions and, for every shot,
+    index of the first target it hits or -1.
+    Shots are tested along the whole path of the step, not only where they
+    end, so fast shots do not pass through thin targets: boxes of the cells
+    swept by the targets go to a grid, the box of the shot path is looked up
+    there, then the target shape is tested at the shot cells along the path.
+    Snapshot is not shared with anything, so it runs in any thread or process.
+    """
+
+    rows, columns = snapshot.rows, snapshot.columns
+    shots_start = [(rows[index], columns[index]) for index in snapshot.shots]
+    targets_start = [(rows[index], columns[index]) for index, *_ in snapshot.targets]
+    step_arrays(rows, columns, snapshot.row_speeds, snapshot.column_speeds, snapshot.dt, snapshot.use_numpy)
+
+    if not snapshot.shots or not snapshot.targets:
+        return rows, columns, [-1] * len(snapshot.shots)
+
+    targets = snapshot.targets
+    grid = BoxGrid([_swept_box(start, rows[index], columns[index], size_rows, size_columns)
+                    for start, (index, size_rows, size_columns, _) in zip(targets_start, targets)])
+
+    hits = []
+    for (shot_row, shot_column), index in zip(shots_start, snapshot.shots):
+        shot_end_row, shot_end_column = rows[index], columns[index]
+        hit = -1
+        for target in grid.hits_box(*_swept_box((shot_row, shot_column), shot_end_row, shot_end_column, 1, 1)):
+            # narrow phase: the swept boxes meet, but the shot could pass a gap of the shape or miss the target
+            target_index, _, _, mask = targets[target]
+            row, column = targets_start[target]
+            if _sweep_hits(row, column, rows[target_index], columns[target_index], mask,
+                           shot_row, shot_column, shot_end_row, shot_end_column):
+                hit = target
+                break
+        hits.append(hit)
+    return rows, columns, hits
+
+
+def _swept_box(start, end_row, end_column, size_rows, size_columns):
+    """Box (row, column, rows, columns) of the cells covered by the box moving from start to the end corner."""
+
+    start_row, start_column = round(start[0]), round(start[1])
+    end_row, end_column = round(end_row), round(end_column)
+    return (min(start_row, end_row), min(start_column, end_column),
+            size_rows + abs(end_row - start_row), size_columns + abs(end_column - start_column))
+
+
+def _sweep_hits(row, column, end_row, end_column, mask, shot_row, shot_column, shot_end_row, shot_end_column):
+    """Test the shot moving to the end against the target of the shape `mask` moving to its end.
+
+    Both move straight during the step, so the shot moves straight relative
+    to the target. Cells of the shot relative to the target corner at the
+    start and at the end of the step are taken as draw_frame rounds the
+    positions, then every cell of the path between them is tested, one
+    step by row or by column at a time, so no cell of the shape is jumped
+    over. The start is tested too: the shot or the target could have been
+    added since the previous step.
+    """
+
+    start_row, start_column = round(shot_row) - round(row), round(shot_column) - round(column)
+    last_row, last_column = round(shot_end_row) - round(end_row), round(shot_end_column) - round(end_column)
+
+    if mask_covers(mask, start_row, start_column):
+        return True
+
+    row_cells, column_cells = abs(last_row - start_row), abs(last_column - start_column)
+    row_step = 1 if last_row > start_row else -1
+    column_step = 1 if last_column > start_column else -1
+    cell_row, cell_column = start_row, start_column
+    rows_done = columns_done = 0
+    while rows_done < row_cells or columns_done < column_cells:
+        # step along the axis whose next cell border the path crosses first
+        if (2 * columns_done + 1) * row_cells < (2 * rows_done + 1) * column_cells:
+            cell_column += column_step
+            columns_done += 1
+        else:
+            cell_row += row_step
+            rows_done += 1
+        if mask_covers(mask, cell_row, cell_column):
+            return True
+    return False
+
+
+class Simulation:
+    """Physics step of the bodies and collisions of shots with targets, once per tick.
+
+    submit() at the end of a tick takes a snapshot of the bodies and starts
+    the next step in the pool, so it runs while the frame is rendered.
+    step() at the start of the next tick takes the result. With no pool,
+    or if the bodies have changed since the snapshot, the step is done in
+    place from a fresh snapshot. simulate() gets the same snapshot either way,
+    so the game goes the same with any number of workers.
+    """
+
+    def __init__(self, bodies, workers=0, kind='thread', dt=1.0):
+        if kind not in POOL_KINDS:
+            raise ValueError(f'Wrong kind value {kind}. Expects one of {POOL_KINDS}.')
+
+        self.bodies = bodies
+        self.dt = dt
+        self.pooled_steps = 0
+        self.inline_steps = 0
+
+        self._targets = {}
+        self._shots = {}
+        self._hits = {}
+        self._version = 0
+        self._pending = None
+        self._pending_version = None
+
+        self._executor = None
+        if workers:
+            if kind == 'thread':
+                self._executor = concurrent.futures.ThreadPoolExecutor(workers)
+            else:
+                self._executor = concurrent.futures.ProcessPoolExecutor(workers)
+
+    def add_target(self, key, body, size, mask=None):
+        """Body `body` is a box of `size` (rows, columns) of the shape `mask` (Sprite.mask,
+        None for the solid box), shots hitting it report `key`."""
+
+        self._targets[key] = (body, size, mask if mask is not None else box_mask(*size))
+        self._version += 1
+
+    def remove_target(self, key):
+        del self._targets[key]
+        self._version += 1
+
+    def add_shot(self, body):
+        self._shots[body] = None
+        self._version += 1
+
+    def remove_shot(self, body):
+        del self._shots[body]
+        self._hits.pop(body, None)
+        self._version += 1
+
+    def hit(self, body):
+        """Key of the target the shot hit on the last step, None if it did not."""
+
+        return self._hits.get(body)
+
+    def submit(self):
+        """Start the next step in the pool, if there is one."""
+
+        if self._executor is None:
+            return
+        self._pending = self._executor.submit(simulate, self._snapshot())
+        self._pending_version = self._state_version()
+
+    def step(self):
+        """Move the bodies and find the shot hits. Return keys of the hit targets."""
+
+        pending, self._pending = self._pending, None
+        if pending is not None and self._pending_version == self._state_version():
+            rows, columns, hits = pending.result()
+            self.pooled_steps += 1
+        else:
+            if pending is not None:
+                pending.cancel()
+            rows, columns, hits = simulate(self._snapshot())
+            self.inline_steps += 1
+
+        self.bodies.load_positions(rows, columns)
+
+        targets = list(self._targets)
+        self._hits = {shot: targets[hit] for shot, hit in zip(self._shots, hits) if hit >= 0}
+        return list(dict.fromkeys(self._hits.values()))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _state_version(self):
+        return self.bodies.version, self._version
+
+    def _snapshot(self):
+        bodies = self.bodies
+        return Snapshot(
+            *bodies.snapshot(),
+            targets=[(bodies.index(body), *size, mask) for body, size, mask in self._targets.values()],
+            shots=[bodies.index(body) for body in self._shots],
+            dt=self.dt,
+            use_numpy=bodies.use_numpy,
+        )
@@ -0,0 +1,164 @@
+import itertools
+import math
+
+
+CELL_SIZE = 8
+
+
+def _box_span(row, column, size_rows, size_columns, cell_size):
+    """Cells of the grid the box is in: (first row, last row, first column, last column)."""
+
+    # upper bounds are taken inclusive, it is enough for half-open boxes
+    return (
+        math.floor(row / cell_size), math.floor((row + size_rows) / cell_size),
+        math.floor(column / cell_size), math.floor((column + size_columns) / cell_size),
+    )
+
+
+def _span_cells(span):
+    first_row, last_row, first_column, last_column = span
+    for cell_row in range(first_row, last_row + 1):
+        for cell_column in range(first_column, last_column + 1):
+            yield cell_row, cell_column
+
+
+class ObstacleIndex:
+    """Obstacles by key with uniform grid over their bounding boxes.
+
+    Works like a dict of obstacles. Call moved(key) when the obstacle changes
+    its position, the grid is updated only if the obstacle crossed a cell border.
+    Collision queries look only into the cells around the point or box and
+    return keys in the order obstacles were added, as iterating the dict would.
+    """
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self._obstacles = {}
+        self._spans = {}
+        self._order = {}
+        self._cells = {}
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._obstacles)
+
+    def __contains__(self, key):
+        return key in self._obstacles
+
+    def __iter__(self):
+        return iter(self._obstacles)
+
+    def __getitem__(self, key):
+        return self._obstacles[key]
+
+    def __setitem__(self, key, obstacle):
+        if key in self._obstacles:
+            self.pop(key)
+        self._obstacles[key] = obstacle
+        self._order[key] = next(self._counter)
+        self._spans[key] = span = self._box_span(obstacle.row, obstacle.column, obstacle.frame_row, obstacle.frame_column)
+        self._add_to_cells(key, span)
+
+    def items(self):
+        return self._obstacles.items()
+
+    def values(self):
+        return self._obstacles.values()
+
+    def pop(self, key, *default):
+        if key not in self._obstacles:
+            if default:
+                return default[0]
+            raise KeyError(key)
+
+        self._remove_from_cells(key, self._spans.pop(key))
+        del self._order[key]
+        return self._obstacles.pop(key)
+
+    def moved(self, key):
+        """Update grid cells of the obstacle after it has changed position or size."""
+
+        obstacle = self._obstacles[key]
+        span = self._box_span(obstacle.row, obstacle.column, obstacle.frame_row, obstacle.frame_column)
+        old_span = self._spans[key]
+        if span == old_span:
+            return
+
+        self._remove_from_cells(key, old_span)
+        self._add_to_cells(key, span)
+        self._spans[key] = span
+
+    def hits_box(self, corner, size, mask=None):
+        """Return keys of obstacles the box (corner, size) collides with.
+
+        With mask (Sprite.mask of the object) only obstacles whose drawn symbols
+        overlap the object are returned. Positions are rounded then, so the cells
+        one cell around the box are looked into as well.
+        """
+
+        cells = self._cells
+        candidates = {}
+        span = self._box_span(*corner, *size) if mask is None else \
+            self._box_span(corner[0] - 1, corner[1] - 1, size[0] + 2, size[1] + 2)
+        for cell_key in _span_cells(span):
+            cell = cells.get(cell_key)
+            if cell:
+                candidates.update(cell)
+
+        if not candidates:
+            return []
+
+        hits = [key for key, obstacle in candidates.items() if obstacle.has_collision(corner, size, mask)]
+        hits.sort(key=self._order.__getitem__)
+        return hits
+
+    def _box_span(self, row, column, size_rows, size_columns):
+        return _box_span(row, column, size_rows, size_columns, self.cell_size)
+
+    def _add_to_cells(self, key, span):
+        obstacle = self._obstacles[key]
+        for cell_key in _span_cells(span):
+            self._cells.setdefault(cell_key, {})[key] = obstacle
+
+    def _remove_from_cells(self, key, span):
+        for cell_key in _span_cells(span):
+            cell = self._cells[cell_key]
+            del cell[key]
+            if not cell:
+                del self._cells[cell_key]
+
+
+class BoxGrid:
+    """Uniform grid over the integer boxes (row, column, rows, columns) of a list, built at once.
+
+    Made for the snapshot of the physics step, which has no index kept
+    between the steps: the grid is built for the step and thrown away.
+    Boxes are half-open, queries return indexes of the boxes in ascending order.
+    """
+
+    def __init__(self, boxes, cell_size=CELL_SIZE):
+        self.boxes = boxes
+        self.cell_size = cell_size
+        self._cells = {}
+        for index, box in enumerate(boxes):
+            for cell_key in _span_cells(_box_span(*box, cell_size)):
+                self._cells.setdefault(cell_key, []).append(index)
+
+    def hits_box(self, row, column, size_rows, size_columns):
+        """Return indexes of the boxes the box intersects."""
+
+        cells = self._cells
+        candidates = set()
+        for cell_key in _span_cells(_box_span(row, column, size_rows, size_columns, self.cell_size)):
+            cell = cells.get(cell_key)
+            if cell:
+                candidates.update(cell)
+
+        boxes = self.boxes
+        hits = []
+        for index in sorted(candidates):
+            box_row, box_column, box_rows, box_columns = boxes[index]
+            if (box_row < row + size_rows and row < box_row + box_rows
+                    and box_column < column + size_columns and column < box_column + box_columns):
+                hits.append(index)
+        return hits
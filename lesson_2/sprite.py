@@ -0,0 +1,78 @@
+class Sprite:
+    """Frame text prepared for drawing.
+
+    Keeps the frame split into lines, its size and for each line the runs of
+    non-space symbols as (offset, symbols, blank) tuples, where blank is the
+    string of spaces of the same length used to erase the run.
+    Spaces around the runs are transparent. Sprites are immutable, so one sprite
+    can be shared by any number of coroutines.
+    mask is the shape of the sprite for collisions: int per line, bit N is set
+    if the symbol in column N is not a space.
+    """
+
+    __slots__ = ('text', 'lines', 'height', 'width', 'runs', 'mask')
+
+    def __init__(self, text):
+        lines = tuple(text.splitlines())
+
+        set_attribute = super().__setattr__
+        set_attribute('text', text)
+        set_attribute('lines', lines)
+        set_attribute('height', len(lines))
+        set_attribute('width', max((len(line) for line in lines), default=0))
+        set_attribute('runs', tuple(tuple(_split_runs(line)) for line in lines))
+        set_attribute('mask', tuple(_runs_mask(runs) for runs in self.runs))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __repr__(self):
+        return f'Sprite(height={self.height}, width={self.width})'
+
+    def size(self):
+        return self.height, self.width
+
+
+def _split_runs(line):
+    """Yield runs of non-space symbols of the line."""
+
+    offset = 0
+    for chunk in line.split(' '):
+        if chunk:
+            yield offset, chunk, ' ' * len(chunk)
+        offset += len(chunk) + 1
+
+
+def _runs_mask(runs):
+    mask = 0
+    for offset, symbols, _ in runs:
+        mask |= ((1 << len(symbols)) - 1) << offset
+    return mask
+
+
+def box_mask(rows, columns):
+    """Mask of the solid box."""
+
+    return ((1 << columns) - 1,) * rows
+
+
+def mask_covers(mask, row, column):
+    """Check if the cell (row, column) of the mask is drawn on, cells out of the mask are not."""
+
+    return 0 <= row < len(mask) and column >= 0 and bool(mask[row] >> column & 1)
+
+
+def masks_overlap(mask, row, column, other_mask, other_row, other_column):
+    """Check if two masks placed at the cells (row, column) have a common cell.
+
+    Rows of the masks are ANDed shifted by the difference of the columns,
+    only the rows both masks have are looked at.
+    """
+
+    shift = column - other_column
+    for mask_row in range(max(row, other_row), min(row + len(mask), other_row + len(other_mask))):
+        line = mask[mask_row - row]
+        line = line << shift if shift >= 0 else line >> -shift
+        if line & other_mask[mask_row - other_row]:
+            return True
+    return False
@@ -0,0 +1,148 @@
+import array
+import curses
+import heapq
+
+from scheduler import sleep
+
+
+# blink phases: attribute of the star and how many ticks it lasts
+# 2 seconds DIM, 0.3 second original, 0.3 second BOLD, 0.5 second original
+PHASES = (
+    (curses.A_DIM, 20),
+    (curses.A_NORMAL, 3),
+    (curses.A_BOLD, 3),
+    (curses.A_NORMAL, 5),
+)
+MAX_PAUSE_TICKS = 10
+
+
+class StarField:
+    """All stars of the sky, blinking by one coroutine.
+
+    Positions, symbols, pauses and current phases of the stars are kept in arrays.
+    Stars wait for their next phase in a timing wheel: tick -> stars to change on
+    that tick, so every tick only the stars changing their attribute are drawn.
+    Each star pauses for its own random number of ticks before every blink cycle.
+    Only the first `visible` stars are shown, the others are erased on their next change.
+    """
+
+    def __init__(self, rows, columns, symbols, pauses, max_row=None, max_column=None):
+        self.rows = array.array('l', rows)
+        self.columns = array.array('l', columns)
+        self.symbols = symbols
+        self.pauses = array.array('l', pauses)
+        self.phases = array.array('b', [-1] * len(self.rows))
+        self.visible = len(self.rows)
+
+        # size of the sky, stars are placed at 1..max_row - 1, 1..max_column - 1
+        self.max_row = max_row if max_row is not None else max(self.rows, default=0) + 1
+        self.max_column = max_column if max_column is not None else max(self.columns, default=0) + 1
+
+        self.tick = 0
+        self._wheel = {}
+        self._ticks = []
+        self._scheduled = bytearray(len(self.rows))
+        # tick the blink coroutine sleeps till
+        self._waking = None
+        for star, pause in enumerate(self.pauses):
+            self._schedule(star, pause)
+
+    def __len__(self):
+        return len(self.rows)
+
+    @classmethod
+    def generate(cls, rng, max_row, max_column, density, symbols):
+        """Place stars randomly, `density` stars per cell of the sky."""
+
+        count = round(density * max_row * max_column)
+        rows, columns, star_symbols, pauses = [], [], [], []
+        for _ in range(count):
+            rows.append(rng.randint(1, max_row - 1))
+            columns.append(rng.randint(1, max_column - 1))
+            star_symbols.append(rng.choice(symbols))
+            pauses.append(rng.randint(0, MAX_PAUSE_TICKS))
+        return cls(rows, columns, ''.join(star_symbols), pauses, max_row, max_column)
+
+    def fit(self, rng, max_row, max_column, density, symbols):
+        """Follow the new size of the sky.
+
+        Stars left out of the sky move to random places in it, the part of the
+        sky that is new gets its own stars. Other stars are not touched.
+        New stars are not visible till set_visible() is called.
+        """
+
+        old_max_row, old_max_column = self.max_row, self.max_column
+        self.max_row, self.max_column = max_row, max_column
+
+        for star in range(len(self.rows)):
+            if self.rows[star] >= max_row or self.columns[star] >= max_column:
+                self.rows[star] = rng.randint(1, max_row - 1)
+                self.columns[star] = rng.randint(1, max_column - 1)
+
+        count = round(density * max_row * max_column) - len(self.rows)
+        new_symbols = []
+        for _ in range(count):
+            while True:
+                row, column = rng.randint(1, max_row - 1), rng.randint(1, max_column - 1)
+                if row >= old_max_row or column >= old_max_column:
+                    break
+            self.rows.append(row)
+            self.columns.append(column)
+            new_symbols.append(rng.choice(symbols))
+            self.pauses.append(rng.randint(0, MAX_PAUSE_TICKS))
+            self.phases.append(-1)
+            self._scheduled.append(0)
+        self.symbols += ''.join(new_symbols)
+
+    def set_visible(self, count):
+        """Show only the first `count` stars."""
+
+        count = max(0, min(count, len(self.rows)))
+        for star in range(self.visible, count):
+            if self._scheduled[star]:
+                continue
+            self.phases[star] = -1
+            if self._waking is not None:
+                # the wheel slot is already taken from the heap, it is processed on waking
+                self._wheel[self._waking].append(star)
+                self._scheduled[star] = 1
+            else:
+                self._schedule(star, self.tick)
+        self.visible = count
+
+    async def blink(self, canvas):
+        """Draw stars changing on every tick, sleep till the next change."""
+
+        while True:
+            if not self._ticks:
+                # no stars are shown, wait for them tick by tick
+                self._wheel[self.tick + 1] = []
+                self._ticks.append(self.tick + 1)
+
+            next_tick = heapq.heappop(self._ticks)
+            self._waking = next_tick
+            await sleep(next_tick - self.tick)
+            self.tick = next_tick
+
+            for star in self._wheel.pop(next_tick):
+                self._scheduled[star] = 0
+                if star >= self.visible:
+                    canvas.addstr(self.rows[star], self.columns[star], ' ')
+                    continue
+
+                phase = (self.phases[star] + 1) % len(PHASES)
+                self.phases[star] = phase
+                attr, duration = PHASES[phase]
+                canvas.addstr(self.rows[star], self.columns[star], self.symbols[star], attr)
+
+                if phase == len(PHASES) - 1:
+                    duration += self.pauses[star]
+                self._schedule(star, next_tick + duration)
+
+    def _schedule(self, star, tick):
+        stars = self._wheel.get(tick)
+        if stars is None:
+            self._wheel[tick] = stars = []
+            heapq.heappush(self._ticks, tick)
+        stars.append(star)
+        self._scheduled[star] = 1
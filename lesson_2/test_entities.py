@@ -0,0 +1,29 @@
+import pytest
+
+from entities import SLOT_MASK, SlotMap
+
+
+def test_stale_id_is_rejected_after_swap_remove_and_slot_reuse():
+    slots = SlotMap()
+    first, second, third = slots.add('first'), slots.add('second'), slots.add('third')
+
+    # the last value takes the place of the removed one
+    assert slots.remove(first) == 'first'
+    assert slots[third] == 'third'
+    assert slots[second] == 'second'
+    assert first not in slots
+
+    # the slot is used again with a new generation, the old id still does not work
+    reused = slots.add('reused')
+    assert reused & SLOT_MASK == first & SLOT_MASK
+    assert reused != first
+    assert slots[reused] == 'reused'
+    assert first not in slots
+    assert slots.get(first) is None
+    with pytest.raises(KeyError):
+        slots[first]
+    with pytest.raises(KeyError):
+        slots.remove(first)
+
+    assert sorted(slots.values()) == ['reused', 'second', 'third']
+    assert len(slots) == 3
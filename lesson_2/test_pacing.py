@@ -0,0 +1,68 @@
+import pytest
+
+from pacing import FramePacer
+
+
+class FakeTime:
+    """Clock and sleep of the pacer, work of the frame is added by work()."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += delay
+
+    def work(self, duration):
+        self.now += duration
+
+
+def _pacer(catch_up, max_catch_up=5):
+    fake = FakeTime()
+    pacer = FramePacer(0.1, catch_up, max_catch_up, clock=fake.clock, sleep=fake.sleep)
+    pacer.reset()
+    return pacer, fake
+
+
+def test_work_time_is_subtracted_from_pause():
+    pacer, fake = _pacer('merge')
+
+    fake.work(0.03)
+    assert pacer.wait() == 1
+    assert fake.sleeps == [pytest.approx(0.07)]
+    assert fake.now == pytest.approx(0.1)
+    assert pacer.lateness == 0.0
+
+
+def test_merge_simulates_missed_ticks():
+    pacer, fake = _pacer('merge', max_catch_up=2)
+
+    # two periods late: both missed ticks are merged into the next frame
+    fake.work(0.35)
+    assert pacer.wait() == 3
+    assert pacer.lateness == pytest.approx(0.25)
+    assert pacer.dropped_ticks == 0
+
+    # four periods late: only max_catch_up are merged, the rest are dropped
+    fake.work(0.5)
+    assert pacer.wait() == 3
+    assert pacer.dropped_ticks == 2
+
+
+def test_drop_skips_missed_ticks():
+    pacer, fake = _pacer('drop')
+
+    fake.work(0.35)
+    assert pacer.wait() == 1
+    assert pacer.dropped_ticks == 2
+    assert pacer.max_lateness == pytest.approx(0.25)
+
+    # deadlines already passed are not waited for, the next frame is on time
+    fake.work(0.01)
+    assert pacer.wait() == 1
+    assert pacer.dropped_ticks == 2
+    assert list(pacer.late_frames) == [pytest.approx(0.25), 0.0]
@@ -0,0 +1,60 @@
+import asyncio
+
+from scheduler import Scheduler, sleep
+
+
+def test_sleep_wakes_on_its_tick():
+    scheduler = Scheduler()
+    woken = []
+
+    async def sleeper():
+        await sleep(3)
+        woken.append(scheduler.tick_number)
+
+    scheduler.spawn(sleeper())
+    for _ in range(5):
+        scheduler.tick()
+
+    # the first step runs on tick 0 and sleeps till tick 3
+    assert woken == [3]
+    assert len(scheduler) == 0
+
+
+def test_cancel_throws_cancelled_error():
+    scheduler = Scheduler()
+    events = []
+
+    async def victim():
+        try:
+            while True:
+                await sleep()
+        except asyncio.CancelledError:
+            events.append('cancelled')
+
+    coroutine = scheduler.spawn(victim())
+    scheduler.tick()
+
+    assert scheduler.cancel(coroutine)
+    assert events == ['cancelled']
+    assert coroutine not in scheduler
+    assert not scheduler.cancel(coroutine)
+
+
+def test_coroutine_spawned_during_tick_runs_on_same_tick():
+    scheduler = Scheduler()
+    ran = []
+
+    async def child():
+        ran.append(('child', scheduler.tick_number))
+        await sleep()
+
+    async def parent():
+        await sleep(2)
+        scheduler.spawn(child())
+        ran.append(('parent', scheduler.tick_number))
+
+    scheduler.spawn(parent())
+    for _ in range(3):
+        scheduler.tick()
+
+    assert ran == [('parent', 2), ('child', 2)]
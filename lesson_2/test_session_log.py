@@ -0,0 +1,37 @@
+from session_log import Recorder, read_log
+
+
+def _record(path):
+    recorder = Recorder(path, seed=42, rows=30, columns=100, start_year=1963)
+    recorder.record(3, [32, 260])
+    recorder.record_resize(5, 20, 60)
+    recorder.record(5, [261])
+    recorder.record(300, [32])
+    recorder.close(400)
+
+
+def test_keys_and_resizes_round_trip(tmp_path):
+    path = tmp_path / 'session.log'
+    _record(path)
+
+    header, keys, resizes, ticks = read_log(path)
+
+    assert header == (42, 30, 100, 1963)
+    assert keys == {3: [32, 260], 5: [261], 300: [32]}
+    assert resizes == {5: (20, 60)}
+    assert ticks == 400
+
+
+def test_log_cut_inside_record_reads_up_to_last_whole_record(tmp_path):
+    path = tmp_path / 'session.log'
+    _record(path)
+    data = path.read_bytes()
+    # the end record is 2 bytes, the cut falls inside the 4 bytes of the last key record
+    path.write_bytes(data[:-3])
+
+    header, keys, resizes, ticks = read_log(path)
+
+    assert keys == {3: [32, 260], 5: [261]}
+    assert resizes == {5: (20, 60)}
+    # the session crashed after the tick of the last keys
+    assert ticks == 6
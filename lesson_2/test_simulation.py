@@ -0,0 +1,49 @@
+import array
+
+import pytest
+
+from simulation import Snapshot, simulate
+from sprite import Sprite
+
+
+# one row of garbage, the thinnest target there is
+THIN_TARGET = Sprite('-----')
+# start offsets of the target and the shot, by 1/40 of a cell
+OFFSETS = 40
+
+
+def _shot_hits(target_row, shot_row, target_speed, shot_speed):
+    """Fly the shot up to the target falling in the same columns, return True if it hits."""
+
+    rows, columns = array.array('d', [target_row, shot_row]), array.array('d', [5.0, 7.0])
+    row_speeds, column_speeds = array.array('d', [target_speed, shot_speed]), array.array('d', [0.0, 0.0])
+    targets = [(0, *THIN_TARGET.size(), THIN_TARGET.mask)]
+
+    # the shot is over the target in a few steps at any of the speeds
+    for _ in range(20):
+        snapshot = Snapshot(rows, columns, row_speeds, column_speeds, targets, [1], dt=1.0, use_numpy=False)
+        rows, columns, hits = simulate(snapshot)
+        if hits[0] == 0:
+            return True
+    return False
+
+
+@pytest.mark.parametrize('target_speed, shot_speed', [(0.5, -0.8), (0.5, -3.0), (2.0, -5.0)])
+def test_shot_does_not_pass_thin_target(target_speed, shot_speed):
+    misses = [
+        (target_offset, shot_offset)
+        for target_offset in range(OFFSETS)
+        for shot_offset in range(OFFSETS)
+        if not _shot_hits(8 + target_offset / OFFSETS, 10 + shot_offset / OFFSETS, target_speed, shot_speed)
+    ]
+    assert misses == []
+
+
+def test_shot_passes_gap_of_shape():
+    target = Sprite('- -')
+    rows, columns = array.array('d', [8.0, 12.0]), array.array('d', [5.0, 6.0])
+    snapshot = Snapshot(rows, columns, array.array('d', [0.5, -3.0]), array.array('d', [0.0, 0.0]),
+                        [(0, *target.size(), target.mask)], [1], dt=1.0, use_numpy=False)
+    for _ in range(5):
+        rows, columns, hits = simulate(snapshot._replace(rows=rows, columns=columns))
+        assert hits == [-1]